@@ -6,83 +6,377 @@ average_and_limits.py
 --------------
 Moduł służy do obliczania średnich czasowych wartości PM2.5 oraz zliczania liczby dni z przekroczeniem normy
 jakości powietrza. 
+
+Klasa `AggregationCube` przechowuje sumy i liczności pomiarów dobowych i pozwala liczyć średnie
+dobowe/miesięczne/roczne oraz przekroczenia norm dla stacji, miast i województw bez ponownego
+przeglądania danych godzinowych. `AggregationCube.from_chunks` buduje ją fragmentami (np. rok po roku
+z `data_loader.iter_combined_data`), dla danych większych niż dostępna pamięć.
+
+Średnie dobowe grupowane są według całkowitych kluczy dni pomiaru (`measurement_days`), liczonych
+bezpośrednio z bufora int64 indeksu czasu.
+
+Funkcje działają zarówno na danych float64, jak i w trybie kompaktowym float32 (`data_loader.compact_frame`).
+Dokładność w trybie kompaktowym: średnie różnią się od wyników float64 względnie o mniej niż 1e-6
+(pomiary PM2.5 mają dokładność 0.1 µg/m³), a liczby dni z przekroczeniem normy mogą się różnić jedynie
+dla dni, których średnia dobowa leży bliżej normy niż ok. 1e-5 µg/m³.
 """
 
 
-def monthly_mean(df):
+def monthly_mean(df, previous=None):
     """
     Funkcja oblicza średnie mieięczne dla każdego roku i stacji 
 
     Args:
         df (pd.DataFrame) : DataFrame z indexem DatetimeIndex oraz scalonymi danymi ze wszystkich badanych lat i stacji. 
+        previous (pd.DataFrame, optional): Wcześniej obliczony wynik `monthly_mean` (np. przed dopisaniem nowych lat).
+            Średnie dla lat z tego wyniku są wykorzystywane ponownie, a liczone są tylko pozostałe lata.
 
     Returns:
         pd.DataFrame: Obiekt z MultiIndexem ['rok', 'miesiąc'] zawierający średnie miesięczne dla każdej stacji.
     """
-    monthly_mean = df.groupby([df.index.year, df.index.month]).mean()
-    monthly_mean.index.names = ['rok', 'miesiąc']  # nadajemy nazwy poziomom indeksu
-    return monthly_mean
+    if previous is not None:
+        done = previous.index.get_level_values('rok').unique()
+        new_rows = ~df.index.year.isin(done)
+        result = pd.concat([previous[df.columns], monthly_mean(df[new_rows])])
+        return result.sort_index() if not result.index.is_monotonic_increasing else result
+
+    monthly = df.groupby([df.index.year, df.index.month]).mean()
+    monthly.index.names = ['rok', 'miesiąc']  # nadajemy nazwy poziomom indeksu
+    return monthly
+
+
+def _ticks_per_day(dtype):
+    # liczba jednostek datetime64 (ns, us, s ...) w jednej dobie
+    return np.timedelta64(1, "D") // np.timedelta64(1, np.datetime_data(dtype)[0])
+
+
+def measurement_days(index):
+    """
+    Zwraca całkowity klucz dnia pomiaru (liczbę dni od 1970-01-01) dla każdego wiersza indeksu czasu.
+
+    Klucz liczony jest dzieleniem całkowitym bufora int64 indeksu datetime64, więc pomiar z 23:59:59
+    (po `data_loader.correct_datetime_index`) należy do tego samego dnia co pozostałe godziny.
+
+    Args:
+        index (pd.DatetimeIndex): Indeks czasu (bez strefy czasowej).
+
+    Returns:
+        np.ndarray: Tablica int64 z numerami dni.
+    """
+    values = index.values
+    return values.view("int64") // _ticks_per_day(values.dtype)
+
+
+def daily_mean(df):
+    """
+    Funkcja oblicza średnie dobowe dla każdej stacji.
+
+    Klucz dnia to całkowity numer dnia pomiaru (`measurement_days`), liczony raz dla indeksu, bez tworzenia
+    obiektów `datetime.date` dla każdego wiersza.
+
+    Args:
+        df (pd.DataFrame): Ramka danych z pomiarami (DatetimeIndex).
+
+    Returns:
+        pd.DataFrame: Średnie dobowe z DatetimeIndex (północ każdego dnia) i kolumnami jak w `df`.
+    """
+    result = df.groupby(measurement_days(df.index)).mean()
+    result.index = pd.DatetimeIndex(result.index.to_numpy().astype("datetime64[D]"))
+    return result
+
+
+def _count_exceedances(df_daily, years, norms):
+    # liczba dni z przekroczeniem dla każdej normy, roku i stacji: tablica (normy x lata x stacje)
+    values = df_daily.to_numpy()
+    day_years = df_daily.index.year.to_numpy()
+    year_onehot = (np.asarray(years)[:, None] == day_years[None, :]).astype("float32")  # lata x dni
+    counts = np.empty((len(norms), len(years), values.shape[1]), dtype="int64")
+    for k, norm in enumerate(norms):
+        # jedna redukcja po dniach (iloczyn macierzy) dla wszystkich lat naraz
+        counts[k] = np.rint(year_onehot @ (values > norm).astype("float32"))
+    return counts
 
 
 def find_above_norm(df, years, sort_by, norm=15):
     """
     Funkcja dla każdej stacji i roku liczy liczbę dni, w których średnie dobowe stężenie PM2.5 przekroczyło normę.  
 
-    Funkcja najpierw sprowadza dane do średnich dobowych, a następnie zlicza wystąpienia przekroczeń 
-    dla każdej stacji w poszczególnych latach.
+    Funkcja najpierw sprowadza dane do średnich dobowych (jednokrotnie), a następnie zlicza wystąpienia przekroczeń 
+    dla każdej stacji, wszystkich lat i norm w jednej operacji.
 
     Args:
         df (pd.DataFrame): Ramka danych z pomiarami (DatetimeIndex).
         years (list[int]): Lista lat, dla których ma zostać przeprowadzona analiza.
         sort_by (int):  Rok według którego zostawnie posortowana tabela wynikowa
-        norm (int, optional): Dobowa norma PM2.5. Domyślnie 15 µg/m³.
+        norm (int | list[int], optional): Dobowa norma PM2.5. Domyślnie 15 µg/m³. Można podać kilka norm,
+            np. [15, 25, 35] - wtedy wynik ma postać długiej (tidy) tabeli.
 
     Returns:
-        pd.dataFrame : Wiersze to miejscowości i kody stacji, a kolumny to lata z liczbą dni przekroczenia normy  
+        pd.dataFrame : Wiersze to miejscowości i kody stacji, a kolumny to lata z liczbą dni przekroczenia normy.
+            Dla listy norm: tabela z kolumnami poziomów stacji oraz 'norma', 'rok', 'liczba_dni',
+            w której stacje dla każdej normy i roku są uporządkowane według liczby dni w roku `sort_by`.
     """
-    
-    norms = {}
+    years = list(years)
+    df_group = daily_mean(df)
+    norms = np.atleast_1d(norm)
+    counts = _count_exceedances(df_group, years, norms)
 
-    df_group = df.groupby(df.index.date).mean() 
+    if np.ndim(norm) == 0:
+        norms_df = pd.DataFrame(counts[0].T, index=df_group.columns, columns=years)
+        norms_df = norms_df.sort_values(by=sort_by) # sortowanie według liczby dni przekroczenia normy w 2024
+        return norms_df
 
-    for year in years:
-        df_station = df_group[pd.to_datetime(df_group.index).year == year] # dane dla danego roku
-        norms[year] = np.array((df_station>norm).sum().values) # liczba dni przekroczenia normy dla każdej stacji
+    names = [name if name is not None else "Kod stacji" for name in df_group.columns.names]
+    stations = df_group.columns.to_frame(index=False).set_axis(names, axis=1)
+    parts = []
+    for k, value in enumerate(norms):
+        order = np.argsort(counts[k, years.index(sort_by)], kind="stable")
+        for j, year in enumerate(years):
+            part = stations.iloc[order].reset_index(drop=True)
+            part["norma"] = value
+            part["rok"] = year
+            part["liczba_dni"] = counts[k, j, order]
+            parts.append(part)
+    return pd.concat(parts, ignore_index=True)
 
-    norms_df = pd.DataFrame(norms, index=df_group.columns)
-    norms_df = norms_df.sort_values(by=sort_by) # sortowanie według liczby dni przekroczenia normy w 2024
-    return norms_df
+def membership_matrix(station_codes, groups):
+    """
+    Funkcja tworzy macierz przynależności stacji do grup (miast, województw lub własnych regionów).
+
+    Args:
+        station_codes (pd.Index | list): Kody stacji (kolejność wierszy macierzy).
+        groups (dict | pd.Series): Mapowanie kodu stacji na nazwę grupy. Stacje bez grupy są pomijane.
+
+    Returns:
+        tuple[np.ndarray, pd.Index]: Macierz 0/1 o wymiarach (stacje x grupy) oraz posortowane nazwy grup.
+    """
+    labels = pd.Index(station_codes).map(groups)
+    names = pd.Index(labels.dropna().unique()).sort_values()
+    codes = names.get_indexer(labels)  # -1 dla stacji bez grupy
+    matrix = np.zeros((len(labels), len(names)))
+    rows = np.flatnonzero(codes >= 0)
+    matrix[rows, codes[rows]] = 1.0
+    return matrix, names
 
-# zadanie z województwami:
-import pandas as pd
 
+def group_mean(df, groups, level="Kod stacji"):
+    """
+    Funkcja uśrednia kolumny stacji w grupach (np. miasta, województwa, własne regiony).
+
+    Średnia liczona jest jako iloczyn macierzy wartości i macierzy przynależności stacji do grup,
+    z pominięciem braków danych (NaN) - bez transponowania i kopiowania całej ramki.
+
+    Args:
+        df (pd.DataFrame): Ramka danych ze stacjami w kolumnach.
+        groups (str | dict | pd.Series): Nazwa poziomu kolumn, według którego grupować (np. 'Miejscowość'),
+            albo mapowanie kodu stacji na grupę (np. wynik `prepare_station_voiv_map`).
+        level (str, optional): Poziom kolumn z kodami stacji używany z mapowaniem. Domyślnie 'Kod stacji'.
+
+    Returns:
+        pd.DataFrame: Średnie dla grup (kolumny posortowane według nazw grup), indeks jak w `df`.
+    """
+    if isinstance(groups, str):  # grupowanie według poziomu kolumn, np. 'Miejscowość'
+        station_codes = pd.RangeIndex(df.shape[1])
+        groups = pd.Series(df.columns.get_level_values(groups), index=station_codes)
+    elif isinstance(df.columns, pd.MultiIndex):
+        station_codes = df.columns.get_level_values(level)
+    else:
+        station_codes = pd.Index(df.columns)
+    matrix, names = membership_matrix(station_codes, groups)
+
+    values = df.to_numpy(dtype="float64")
+    observed = ~np.isnan(values)
+    sums = np.where(observed, values, 0.0) @ matrix
+    counts = observed.astype("float64") @ matrix
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts  # brak pomiarów w grupie -> NaN
+    return pd.DataFrame(means, index=df.index, columns=names)
+
+
+# zadanie z województwami:
 def voivodeship_exceedances(df, voiv_map, years=(2015, 2018, 2021, 2024),norm = 15.0, station_col = "Kod stacji"):
     """
     Liczy liczbę dni w roku, w których dobowa średnia PM2.5 uśredniona 
     po wszystkich stacjach w danym województwie przekroczyła normę.
+
+    Uśrednianie po stacjach wykonywane jest przez `group_mean`, więc zamiast mapowania na województwa
+    można podać dowolne mapowanie stacji na regiony lub nazwę poziomu kolumn (np. 'Miejscowość').
     """
     # Średnia dobowa na stację:
-    df_daily = df.resample("D").mean()
-
-    # Wyciąganie kodów stacji z kolumn
-    if isinstance(df_daily.columns, pd.MultiIndex):
-        station_codes = df_daily.columns.get_level_values("Kod stacji")
-    else:
-        station_codes = pd.Index(df_daily.columns)
-
-    # mapowanie województw dla stacji
-    voiv_for_station = station_codes.map(voiv_map)
+    df_daily = daily_mean(df)
 
     # Średnia dobowa po województwach
-    df_voiv_daily = (df_daily.T.groupby(voiv_for_station).mean().T)
+    df_voiv_daily = group_mean(df_daily, voiv_map, level=station_col)
 
     # Zliczanie dni powyżej normy w każdym roku
-    out = {}
-    for y in years:
-        df_y = df_voiv_daily[df_voiv_daily.index.year == y]
-        out[y] = (df_y > norm).sum()  
-        
-    return pd.DataFrame(out).sort_index()
+    years = list(years)
+    counts = _count_exceedances(df_voiv_daily, years, [norm])[0]
+    return pd.DataFrame(counts.T, index=df_voiv_daily.columns, columns=years).sort_index()
+
+
+class AggregationCube:
+    """
+    Kostka agregacji zbudowana jednorazowo ze scalonych danych godzinowych.
+
+    Przy tworzeniu dane godzinowe są przeglądane raz: dla każdego dnia i stacji zapisywana jest suma
+    i liczba pomiarów. Średnie miesięczne i roczne powstają przez zsumowanie tych częściowych agregatów,
+    a średnie dla miast i województw - przez uśrednienie średnich stacji (`group_mean`), tak jak
+    w `voivodeship_exceedances` i przy grupowaniu wyniku `monthly_mean` po miastach.
+    Wyniki zapytań są zapamiętywane.
+
+    Args:
+        df (pd.DataFrame): Scalona ramka danych godzinowych (DatetimeIndex, stacje w kolumnach).
+        voiv_map (dict | pd.Series, optional): Mapowanie kodu stacji na województwo (`prepare_station_voiv_map`).
+        station_col (str, optional): Poziom kolumn z kodami stacji. Domyślnie 'Kod stacji'.
+    """
+
+    FREQS = ("D", "M", "Y")
+
+    def __init__(self, df, voiv_map=None, station_col="Kod stacji"):
+        self.columns = df.columns
+        self.voiv_map = voiv_map
+        self.station_col = station_col
+
+        self._partials = {"D": self._daily_partials(df)}
+        self._cache = {}
+
+    @staticmethod
+    def _daily_partials(df):
+        # sumy i liczby pomiarów dla każdego dnia i stacji (jedyny przegląd danych godzinowych)
+        values = df.to_numpy(dtype="float64")
+        observed = ~np.isnan(values)
+        day_codes, days = pd.factorize(measurement_days(df.index), sort=True)
+        return (
+            pd.DataFrame(np.where(observed, values, 0.0)).groupby(day_codes).sum().to_numpy(),
+            pd.DataFrame(observed).groupby(day_codes).sum().to_numpy(dtype="float64"),
+            pd.DatetimeIndex(days.astype("datetime64[D]")),
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks, voiv_map=None, station_col="Kod stacji"):
+        """
+        Buduje kostkę z kolejnych fragmentów danych (np. `data_loader.iter_combined_data`).
+
+        W pamięci jest naraz tylko jeden fragment danych godzinowych oraz sumy dobowe, które są
+        łączone po przejściu wszystkich fragmentów. Dni podzielone między fragmenty są sumowane.
+
+        Args:
+            chunks (iterable[pd.DataFrame]): Fragmenty danych godzinowych o tych samych kolumnach.
+            voiv_map (dict | pd.Series, optional): Mapowanie kodu stacji na województwo.
+            station_col (str, optional): Poziom kolumn z kodami stacji. Domyślnie 'Kod stacji'.
+
+        Returns:
+            AggregationCube: Kostka równoważna zbudowanej z całych danych.
+
+        Raises:
+            ValueError: Jeśli fragmenty mają różne kolumny lub nie podano żadnego fragmentu.
+        """
+        cube = None
+        parts = []
+        for chunk in chunks:
+            if cube is None:
+                cube = cls(chunk, voiv_map, station_col)
+                parts.append(cube._partials["D"])
+            elif not chunk.columns.equals(cube.columns):
+                raise ValueError("Fragmenty danych mają różne kolumny.")
+            else:
+                parts.append(cls._daily_partials(chunk))
+        if cube is None:
+            raise ValueError("Nie podano żadnego fragmentu danych.")
+        cube._partials = {"D": cls._merge_partials(parts)}
+        return cube
+
+    @staticmethod
+    def _merge_partials(parts):
+        sums = np.concatenate([part[0] for part in parts])
+        counts = np.concatenate([part[1] for part in parts])
+        days = pd.DatetimeIndex(np.concatenate([part[2].values for part in parts]))
+        if days.is_unique and days.is_monotonic_increasing:
+            return sums, counts, days
+        day_codes, unique_days = pd.factorize(days, sort=True)  # dni podzielone między fragmenty
+        return (
+            pd.DataFrame(sums).groupby(day_codes).sum().to_numpy(),
+            pd.DataFrame(counts).groupby(day_codes).sum().to_numpy(),
+            pd.DatetimeIndex(unique_days),
+        )
+
+    def _rollup(self, freq):
+        # sumy i liczności dla miesięcy / lat z sum dobowych (bez danych godzinowych)
+        if freq not in self._partials:
+            if freq not in self.FREQS:
+                raise ValueError(f"Nieznany poziom agregacji: {freq}. Dostępne: {', '.join(self.FREQS)}")
+            sums, counts, days = self._partials["D"]
+            if freq == "M":
+                keys = [days.year, days.month]
+                index_names = ['rok', 'miesiąc']
+            else:
+                keys = [days.year]
+                index_names = ['rok']
+            grouped_sums = pd.DataFrame(sums).groupby(keys).sum()
+            grouped_counts = pd.DataFrame(counts).groupby(keys).sum()
+            index = grouped_sums.index.set_names(index_names)
+            self._partials[freq] = (grouped_sums.to_numpy(), grouped_counts.to_numpy(), index)
+        return self._partials[freq]
+
+    def _groups(self, by):
+        if by == "city":
+            return "Miejscowość"
+        if by == "voivodeship":
+            if self.voiv_map is None:
+                raise ValueError("Do agregacji po województwach potrzebne jest mapowanie voiv_map.")
+            return self.voiv_map
+        return by  # własne mapowanie stacji na regiony lub nazwa poziomu kolumn
+
+    def mean(self, freq="M", by="station"):
+        """
+        Zwraca średnie dla wybranego poziomu czasu i grupowania stacji.
+
+        Args:
+            freq (str, optional): "D" (dobowe), "M" (miesięczne) lub "Y" (roczne). Domyślnie "M".
+            by (str | dict | pd.Series, optional): "station", "city", "voivodeship" albo własne mapowanie
+                kodu stacji na region. Domyślnie "station".
+
+        Returns:
+            pd.DataFrame: Średnie; indeks to dni, ['rok', 'miesiąc'] lub 'rok'.
+        """
+        # własne mapowanie zapamiętywane według kopii jego zawartości (nie według id obiektu)
+        key = (freq, by if isinstance(by, str) else tuple(sorted(pd.Series(by).items())))
+        if key not in self._cache:
+            if isinstance(by, str) and by == "station":
+                sums, counts, index = self._rollup(freq)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    means = sums / counts  # brak pomiarów -> NaN
+                self._cache[key] = pd.DataFrame(means, index=index, columns=self.columns)
+            else:
+                self._cache[key] = group_mean(self.mean(freq, "station"), self._groups(by), level=self.station_col)
+        return self._cache[key]
+
+    def monthly_mean(self):
+        """Zwraca średnie miesięczne stacji w formacie wyniku `monthly_mean`."""
+        return self.mean("M", "station")
+
+    def exceedances(self, years, norm=15, by="station", sort_by=None):
+        """
+        Zwraca liczbę dni w roku, w których średnia dobowa przekroczyła normę.
+
+        Args:
+            years (list[int]): Lata do analizy.
+            norm (float, optional): Dobowa norma PM2.5. Domyślnie 15 µg/m³.
+            by (str | dict | pd.Series, optional): Grupowanie stacji jak w `mean`. Domyślnie "station".
+            sort_by (int, optional): Rok, według którego posortować wynik. Domyślnie None - sortowanie
+                według nazw (dla grup) lub kolejność stacji.
+
+        Returns:
+            pd.DataFrame: Wiersze to stacje lub grupy, kolumny to lata (jak `find_above_norm`
+                i `voivodeship_exceedances`).
+        """
+        years = list(years)
+        daily = self.mean("D", by)
+        counts = _count_exceedances(daily, years, [norm])[0]
+        result = pd.DataFrame(counts.T, index=daily.columns, columns=years)
+        if sort_by is not None:
+            return result.sort_values(by=sort_by)
+        return result if isinstance(by, str) and by == "station" else result.sort_index()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,516 @@
+import re
+import sys
+import json
+import argparse
+import platform
+import time
+import subprocess
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from data_loader import (edit_df, read_gios_sheet, create_code_map, multiindex_code_city, correct_datetime_index,
+                         process_years_parallel)
+import data_loader
+from data_loader import save_combined_data, prepare_station_voiv_map
+from average_and_limits import find_above_norm, monthly_mean, voivodeship_exceedances
+from visualizations import monthly_grid
+
+"""
+benchmarks.py
+-------------
+Moduł z pomiarami wydajności wybranych etapów potoku na syntetycznych danych w formacie GIOŚ.
+Uruchomienie: python benchmarks.py (wszystkie pomiary) lub python benchmarks.py --stages [--check | --save-baseline]
+(tylko etapy potoku, z porównaniem do zapisanego punktu odniesienia `benchmarks_baseline.json`).
+
+Funkcje:
+- make_gios_sheet: tworzy syntetyczny arkusz GIOŚ (wiersze opisowe + pomiary godzinowe)
+- write_gios_xlsx: zapisuje syntetyczny arkusz do pliku .xlsx
+- make_gios_metadata: tworzy syntetyczne metadane stacji zgodne z make_gios_sheet
+- make_hourly_frame: tworzy syntetyczną scaloną ramkę godzinową (stacje x lata) jak z save_combined_data
+- timeit: zwraca najlepszy czas wykonania funkcji z kilku powtórzeń
+- peak_memory: zwraca szczytowe zużycie pamięci przez funkcję
+- bench_edit_df: porównuje wektorowe edit_df z wcześniejszą implementacją w pętli
+- bench_read_gios_sheet: porównuje strumieniowe read_gios_sheet z pd.read_excel + edit_df
+- bench_find_above_norm: mierzy skalowanie find_above_norm względem liczby stacji i lat
+- bench_process_years_parallel: porównuje przetwarzanie lat w puli procesów z przetwarzaniem sekwencyjnym
+- bench_stages: mierzy czas każdego etapu potoku (edit_df ... voivodeship_exceedances) na syntetycznych danych
+- save_baseline / check_baseline: zapisują punkt odniesienia i wykrywają spowolnienia etapów względem niego
+- bench_import_time: mierzy czas importu modułów projektu w nowym interpreterze i wczytane ciężkie biblioteki
+- bench_monthly_grid: porównuje przygotowanie danych heatmap (monthly_grid) z pivot dla każdego miasta
+"""
+
+# wiersze opisowe poprzedzające pomiary w arkuszach GIOŚ
+HEADER_ROWS = ["Nr", "Kod stacji", "Wskaźnik", "Czas uśredniania", "Jednostka", "Kod stanowiska"]
+
+
+def make_gios_sheet(n_stations=300, year=2023, decimal_comma=False, seed=0):
+    """
+    Tworzy syntetyczny arkusz w formacie surowego arkusza GIOŚ (jak zwraca `pd.read_excel(header=None)`).
+
+    Args:
+        n_stations (int): Liczba stacji (kolumn z pomiarami).
+        year (int): Rok pomiarów - arkusz zawiera wszystkie godziny roku.
+        decimal_comma (bool): Czy zapisać wartości jako tekst z przecinkiem dziesiętnym.
+        seed (int): Ziarno generatora liczb losowych.
+
+    Returns:
+        pd.DataFrame: Ramka z wierszami opisowymi, wierszem 'Kod stacji' i pomiarami godzinowymi.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(f"{year}-01-01 01:00", f"{year + 1}-01-01 00:00", freq="h")
+    values = rng.gamma(2.0, 10.0, size=(len(dates), n_stations)).round(1)
+    values[rng.random(values.shape) < 0.05] = np.nan  # braki pomiarów
+    codes = [f"Xx{i:04d}A" for i in range(n_stations)]
+
+    body = pd.DataFrame(values).astype(object)
+    if decimal_comma:
+        body = body.map(lambda v: "" if pd.isna(v) else str(v).replace(".", ","))
+    body.insert(0, "data", list(dates.to_pydatetime()))
+    body.columns = range(n_stations + 1)
+
+    header = pd.DataFrame([[name] + (codes if name == "Kod stacji" else [name] * n_stations)
+                           for name in HEADER_ROWS])
+    return pd.concat([header, body], ignore_index=True)
+
+
+def write_gios_xlsx(sheet, path):
+    """Zapisuje arkusz z `make_gios_sheet` do pliku .xlsx (puste komórki zamiast NaN)."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for row in sheet.itertuples(index=False):
+        ws.append([None if isinstance(v, float) and np.isnan(v) else v for v in row])
+    wb.save(path)
+
+
+def make_gios_metadata(n_stations=300, n_cities=None, n_voivodeships=16):
+    """
+    Tworzy syntetyczne metadane stacji (jak z `download_gios_metadata`) dla kodów z `make_gios_sheet`.
+    Co dziesiąta stacja ma w arkuszach stary kod, mapowany na aktualny.
+
+    Returns:
+        pd.DataFrame: Metadane z kolumnami kodów, starych kodów, miejscowości i województw.
+    """
+    n_cities = n_cities or max(n_stations // 3, 1)
+    codes = [f"Xx{i:04d}A" for i in range(n_stations)]
+    return pd.DataFrame({
+        "Kod stacji": [f"Nw{i:04d}A" if i % 10 == 0 else code for i, code in enumerate(codes)],
+        "Stary Kod stacji \n(o ile inny od aktualnego)": [code if i % 10 == 0 else None for i, code in enumerate(codes)],
+        "Miejscowość": [f"Miasto{i % n_cities}" for i in range(n_stations)],
+        "Województwo": [f"Województwo{i % n_voivodeships}" for i in range(n_stations)],
+    })
+
+
+def make_hourly_frame(n_stations=100, years=(2015, 2018, 2021, 2024), n_cities=None, seed=0):
+    """
+    Tworzy syntetyczną scaloną ramkę godzinową w formacie wyniku `save_combined_data`.
+
+    Args:
+        n_stations (int): Liczba stacji.
+        years (list[int]): Lata pomiarów.
+        n_cities (int, optional): Liczba miejscowości. Domyślnie jedna na 3 stacje.
+        seed (int): Ziarno generatora liczb losowych.
+
+    Returns:
+        pd.DataFrame: Ramka z MultiIndexem kolumn ['Miejscowość', 'Kod stacji'] i indeksem
+            przesuniętym jak po `correct_datetime_index`.
+    """
+    rng = np.random.default_rng(seed)
+    n_cities = n_cities or max(n_stations // 3, 1)
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{year}-01-01 01:00", f"{year + 1}-01-01 00:00", freq="h").values for year in years
+    ]))
+    index = index - pd.to_timedelta((index.hour == 0).astype(int), unit="s")
+    columns = pd.MultiIndex.from_arrays(
+        [[f"Miasto{i % n_cities}" for i in range(n_stations)], [f"Xx{i:04d}A" for i in range(n_stations)]],
+        names=["Miejscowość", "Kod stacji"],
+    )
+    values = rng.gamma(2.0, 10.0, size=(len(index), n_stations)).round(1)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def timeit(func, *args, repeat=3, **kwargs):
+    """Zwraca najlepszy (najkrótszy) czas wykonania funkcji w sekundach z `repeat` powtórzeń."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func, *args, **kwargs):
+    """Zwraca szczytowe zużycie pamięci (w MB) podczas wykonania funkcji, mierzone przez tracemalloc."""
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1] / 1024**2
+    finally:
+        tracemalloc.stop()
+
+
+def _edit_df_loop(df_dict):
+    # wcześniejsza implementacja edit_df (pętla po wierszach) - punkt odniesienia dla pomiarów
+    out = {}
+    for year, df in df_dict.items():
+        df_edited = df.copy()
+        pattern_date = re.compile(r"\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}")
+        rows_to_drop = []
+        header_row_id = None
+        for i in range(len(df_edited)):
+            row = df_edited.iloc[i, 0]
+            if row == 'Kod stacji':
+                header_row_id = i
+            elif not pattern_date.match(str(row)):
+                rows_to_drop.append(i)
+        df_edited.drop(labels=rows_to_drop, axis=0, inplace=True)
+        df_edited.columns = df.loc[header_row_id]
+        df_edited.drop(labels=[header_row_id], axis=0, inplace=True)
+        df_edited.reset_index(drop=True, inplace=True)
+        df_edited['Kod stacji'] = pd.to_datetime(df_edited['Kod stacji'])
+        df_edited['Kod stacji'] = df_edited['Kod stacji'].dt.floor('h')
+        df_edited.set_index('Kod stacji', inplace=True)
+        for col in df_edited.columns:
+            df_edited[col] = pd.to_numeric(df_edited[col].astype(str).str.replace(',', '.'), errors='coerce')
+        out[year] = df_edited
+    return out
+
+
+def bench_edit_df(n_stations=300, decimal_comma=False):
+    """
+    Porównuje czas wektorowego `edit_df` z implementacją w pętli dla jednego syntetycznego roku.
+
+    Returns:
+        dict: Czasy w sekundach {'loop': ..., 'vectorized': ...} oraz przyspieszenie 'speedup'.
+    """
+    df_dict = {2023: make_gios_sheet(n_stations, decimal_comma=decimal_comma)}
+    loop = timeit(_edit_df_loop, df_dict, repeat=1)
+    vectorized = timeit(edit_df, df_dict)
+    return {"loop": loop, "vectorized": vectorized, "speedup": loop / vectorized}
+
+
+def _find_above_norm_loop(df, years, sort_by, norm=15):
+    # wcześniejsza implementacja find_above_norm (daty jako obiekty date, pętla po latach)
+    norms = {}
+    df_group = df.groupby(df.index.date).mean()
+    for year in years:
+        df_station = df_group[pd.to_datetime(df_group.index).year == year]
+        norms[year] = np.array((df_station > norm).sum().values)
+    return pd.DataFrame(norms, index=df_group.columns).sort_values(by=sort_by)
+
+
+def bench_find_above_norm(stations=(50, 100, 200), n_years=(1, 2, 4)):
+    """
+    Mierzy czas `find_above_norm` dla siatki (liczba stacji x liczba lat) oraz porównuje go
+    z wcześniejszą implementacją dla największego rozmiaru.
+
+    Returns:
+        dict: Czasy w sekundach {(stacje, lata): czas}, czas na stację-rok 'per_station_year'
+            oraz czasy 'loop' i 'vectorized' dla największego rozmiaru.
+    """
+    all_years = [2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022]
+    result = {}
+    for n_st in stations:
+        for n_y in n_years:
+            df = make_hourly_frame(n_st, all_years[:n_y])
+            result[(n_st, n_y)] = timeit(find_above_norm, df, all_years[:n_y], all_years[0], norm=[15, 25, 35])
+    result["per_station_year"] = {key: t / (key[0] * key[1]) for key, t in result.items()}
+    years = all_years[:max(n_years)]
+    df = make_hourly_frame(max(stations), years)
+    result["loop"] = timeit(_find_above_norm_loop, df, years, years[0], repeat=1)
+    result["vectorized"] = timeit(find_above_norm, df, years, years[0])
+    return result
+
+
+def bench_process_years_parallel(n_stations=50, n_years=(1, 2, 4), max_workers=None):
+    """
+    Porównuje `process_years_parallel` z przetwarzaniem sekwencyjnym dla rosnącej liczby lat.
+    Źródłami są pliki .xlsx, więc wczytywanie arkuszy (najdroższy krok) odbywa się w procesach roboczych.
+    Przy wielu procesorach czas przetwarzania równoległego powinien rosnąć z liczbą lat znacznie wolniej
+    niż sekwencyjnego (do liczby procesorów).
+
+    Returns:
+        dict: {liczba lat: {'serial': czas, 'parallel': czas}} w sekundach.
+    """
+    metadata = make_gios_metadata(n_stations)
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for i in range(max(n_years)):
+            paths[2015 + i] = Path(tmp) / f"{2015 + i}.xlsx"
+            write_gios_xlsx(make_gios_sheet(n_stations, year=2015 + i, seed=i), paths[2015 + i])
+
+        for n_y in n_years:
+            sources = dict(list(paths.items())[:n_y])
+
+            def serial():
+                data = {year: read_gios_sheet(path) for year, path in sources.items()}
+                data = create_code_map(metadata, data)
+                return correct_datetime_index(multiindex_code_city(data, metadata))
+
+            result[n_y] = {
+                "serial": timeit(serial, repeat=1),
+                "parallel": timeit(process_years_parallel, sources, metadata, max_workers=max_workers, repeat=1),
+            }
+    return result
+
+
+def bench_read_gios_sheet(n_stations=100):
+    """
+    Porównuje strumieniowe `read_gios_sheet` z `pd.read_excel` + `edit_df` dla jednego syntetycznego roku.
+
+    Returns:
+        dict: Czasy w sekundach ('stream', 'pandas') i szczytowa pamięć w MB ('stream_mb', 'pandas_mb').
+    """
+    def via_pandas(path):
+        return edit_df({0: pd.read_excel(path, header=None)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sheet.xlsx"
+        write_gios_xlsx(make_gios_sheet(n_stations), path)
+        return {
+            "stream": timeit(read_gios_sheet, path, repeat=1),
+            "pandas": timeit(via_pandas, path, repeat=1),
+            "stream_mb": peak_memory(read_gios_sheet, path),
+            "pandas_mb": peak_memory(via_pandas, path),
+        }
+
+
+def _city_pivots_loop(monthly_df_grouped):
+    # wcześniejsza implementacja danych dla heatmap: reset_index + pivot osobno dla każdego miasta
+    pivots = []
+    for city in monthly_df_grouped.columns:
+        city_data = monthly_df_grouped[city].reset_index()
+        city_data.columns = ['rok', 'miesiąc', 'PM2.5']
+        city_data['PM2.5'] = pd.to_numeric(city_data['PM2.5'])
+        pivots.append(city_data.pivot(index='rok', columns='miesiąc', values='PM2.5'))
+    return pivots
+
+
+def bench_monthly_grid(n_cities=1000, n_years=10, seed=0):
+    """
+    Porównuje przygotowanie danych heatmap dla `n_cities` miast: `monthly_grid` (jedna tablica 3-D)
+    z wcześniejszym `reset_index`/`pivot` dla każdego miasta.
+
+    Returns:
+        dict: Czasy w sekundach 'loop' i 'grid' oraz przyspieszenie 'speedup'.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product([range(2010, 2010 + n_years), range(1, 13)], names=['rok', 'miesiąc'])
+    monthly = pd.DataFrame(rng.gamma(2.0, 10.0, size=(len(index), n_cities)), index=index,
+                           columns=[f"Miasto{k}" for k in range(n_cities)])
+    result = {
+        "loop": timeit(_city_pivots_loop, monthly, repeat=1),
+        "grid": timeit(monthly_grid, monthly),
+    }
+    result["speedup"] = result["loop"] / result["grid"]
+    return result
+
+
+BASELINE_PATH = Path(__file__).with_name("benchmarks_baseline.json")
+
+# rozmiary danych dla pomiarów etapów: nazwa -> (liczba stacji, lata)
+STAGE_SIZES = {
+    "small": (20, (2023,)),
+    "medium": (100, (2022, 2023)),
+}
+
+
+def _clear_caches():
+    # pamięć podręczna w procesie (indeksy stacji) - każdy pomiar liczy od zera
+    data_loader._station_indexes.clear()
+    data_loader._station_registries.clear()
+
+
+def _timeit_setup(setup, func, repeat=3):
+    # najlepszy czas `func(setup())` - przygotowanie danych (np. kopie ramek) nie jest mierzone
+    best = float("inf")
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_stages(n_stations=100, years=(2022, 2023), repeat=3):
+    """
+    Mierzy czas każdego etapu potoku na syntetycznych danych w formacie GIOŚ (`make_gios_sheet`,
+    z wierszami opisowymi usuwanymi przez `edit_df` i starymi kodami stacji w metadanych).
+
+    Etapy mierzone są w kolejności potoku, każdy na wyniku poprzedniego; funkcje zmieniające dane
+    wejściowe dostają świeże kopie, a pamięć podręczna w procesie jest czyszczona przed każdym pomiarem.
+
+    Args:
+        n_stations (int): Liczba stacji.
+        years (list[int]): Lata danych.
+        repeat (int): Liczba powtórzeń (wynik to najlepszy czas).
+
+    Returns:
+        dict: Czasy w sekundach {etap: czas}.
+    """
+    years = list(years)
+    raw = {year: make_gios_sheet(n_stations, year=year, seed=k) for k, year in enumerate(years)}
+    metadata = make_gios_metadata(n_stations)
+    result = {}
+
+    def copies(df_dict):
+        return {year: df.copy() for year, df in df_dict.items()}
+
+    def fresh(*args):
+        _clear_caches()
+        return args
+
+    result["edit_df"] = _timeit_setup(lambda: fresh(raw), edit_df, repeat)
+    cleaned = edit_df(raw)
+    result["create_code_map"] = _timeit_setup(lambda: fresh(metadata, copies(cleaned)), create_code_map, repeat)
+    mapped = create_code_map(metadata, copies(cleaned))
+    result["multiindex_code_city"] = _timeit_setup(lambda: fresh(mapped, metadata), multiindex_code_city, repeat)
+    with_cities = multiindex_code_city(mapped, metadata)
+    result["correct_datetime_index"] = _timeit_setup(lambda: fresh(copies(with_cities)), correct_datetime_index,
+                                                     repeat)
+    shifted = correct_datetime_index(copies(with_cities))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result["save_combined_data"] = _timeit_setup(lambda: fresh(shifted, Path(tmp) / "dane.csv"),
+                                                     save_combined_data, repeat)
+        df_all = save_combined_data(shifted, Path(tmp) / "dane.csv")
+
+    voiv_map = prepare_station_voiv_map(metadata)
+    result["monthly_mean"] = _timeit_setup(lambda: fresh(df_all), monthly_mean, repeat)
+    result["find_above_norm"] = _timeit_setup(lambda: fresh(df_all, years, years[0]), find_above_norm, repeat)
+    result["voivodeship_exceedances"] = _timeit_setup(lambda: fresh(df_all, voiv_map, years),
+                                                      voivodeship_exceedances, repeat)
+    return result
+
+
+def run_stage_suite(sizes=None, repeat=3):
+    """Uruchamia `bench_stages` dla rozmiarów `STAGE_SIZES`. Zwraca {rozmiar: {etap: czas}}."""
+    sizes = sizes or STAGE_SIZES
+    return {name: bench_stages(n_stations, years, repeat) for name, (n_stations, years) in sizes.items()}
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Zapisuje wyniki `run_stage_suite` jako punkt odniesienia (z opisem maszyny) do pliku JSON."""
+    data = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor(), "pandas": pd.__version__, "numpy": np.__version__},
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def check_baseline(results, path=BASELINE_PATH, tolerance=1.5):
+    """
+    Porównuje wyniki `run_stage_suite` z zapisanym punktem odniesienia.
+
+    Args:
+        results (dict): Wyniki {rozmiar: {etap: czas}}.
+        path (str | Path): Plik z punktem odniesienia.
+        tolerance (float): Dopuszczalny stosunek czasu bieżącego do odniesienia. Domyślnie 1.5.
+
+    Returns:
+        dict: Spowolnione etapy {(rozmiar, etap): (czas odniesienia, czas bieżący)}; pusty, jeśli brak spowolnień.
+    """
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = {}
+    for size, stages in results.items():
+        for stage, elapsed in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference is not None and elapsed > tolerance * reference:
+                regressions[(size, stage)] = (reference, elapsed)
+    return regressions
+
+
+# biblioteki, które nie powinny być wczytywane przy samym imporcie modułów projektu
+HEAVY_MODULES = ["requests", "openpyxl", "matplotlib", "seaborn"]
+
+
+def bench_import_time(modules=("data_loader", "average_and_limits", "visualizations"), repeat=3):
+    """
+    Mierzy czas importu modułów projektu w nowym procesie Pythona (bez wpływu wcześniejszych importów)
+    i sprawdza, które z ciężkich bibliotek `HEAVY_MODULES` zostały przy tym wczytane.
+
+    Returns:
+        dict: {moduł: {'time': najlepszy czas importu w sekundach, 'heavy': lista wczytanych bibliotek}}.
+    """
+    script = (
+        "import sys, time; import pandas, numpy; start = time.perf_counter(); import {module}; "
+        "print(time.perf_counter() - start); print(' '.join(m for m in {heavy} if m in sys.modules))"
+    )
+    result = {}
+    for module in modules:
+        times = []
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, "-c", script.format(module=module, heavy=HEAVY_MODULES)],
+                                 capture_output=True, text=True, check=True, cwd=Path(__file__).parent)
+            elapsed, heavy = (out.stdout.splitlines() + [""])[:2]
+            times.append(float(elapsed))
+        result[module] = {"time": min(times), "heavy": heavy.split()}
+    return result
+
+
+def _print_stages(results):
+    for size, stages in results.items():
+        n_stations, years = STAGE_SIZES[size]
+        print(f"etapy potoku ({size}: {n_stations} stacji x {len(years)} lat):")
+        for stage, elapsed in stages.items():
+            print(f"  {stage}: {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pomiary wydajności potoku na syntetycznych danych GIOŚ.")
+    parser.add_argument("--stages", action="store_true", help="tylko pomiary etapów potoku")
+    parser.add_argument("--save-baseline", action="store_true", help="zapisz wyniki etapów jako punkt odniesienia")
+    parser.add_argument("--check", action="store_true", help="porównaj wyniki etapów z punktem odniesienia")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="dopuszczalne spowolnienie (domyślnie 1.5)")
+    args = parser.parse_args()
+
+    stage_results = run_stage_suite()
+    _print_stages(stage_results)
+    if args.save_baseline:
+        save_baseline(stage_results)
+        print(f"Zapisano punkt odniesienia: {BASELINE_PATH.name}")
+    if args.check:
+        regressions = check_baseline(stage_results, tolerance=args.tolerance)
+        for (size, stage), (reference, elapsed) in regressions.items():
+            print(f"SPOWOLNIENIE {size}/{stage}: {reference * 1e3:.1f} ms -> {elapsed * 1e3:.1f} ms")
+        if regressions:
+            sys.exit(1)
+    if args.stages or args.save_baseline or args.check:
+        sys.exit(0)
+
+    for comma in (False, True):
+        result = bench_edit_df(decimal_comma=comma)
+        print(f"edit_df (300 stacji, przecinek={comma}): pętla {result['loop']:.2f} s, "
+              f"wektorowo {result['vectorized']:.3f} s, przyspieszenie x{result['speedup']:.1f}")
+
+    result = bench_read_gios_sheet()
+    print(f"read_gios_sheet (100 stacji): strumieniowo {result['stream']:.1f} s / {result['stream_mb']:.0f} MB, "
+          f"read_excel + edit_df {result['pandas']:.1f} s / {result['pandas_mb']:.0f} MB")
+
+    result = bench_find_above_norm()
+    for key, per in result["per_station_year"].items():
+        print(f"find_above_norm (3 normy) {key[0]} stacji x {key[1]} lat: {result[key]:.3f} s, "
+              f"{per * 1e3:.3f} ms na stację-rok")
+    print(f"find_above_norm (200 stacji x 4 lata): poprzednio {result['loop']:.2f} s, "
+          f"wektorowo {result['vectorized']:.3f} s")
+
+    for n_y, times in bench_process_years_parallel().items():
+        print(f"process_years_parallel ({n_y} lat, 50 stacji, pliki .xlsx): sekwencyjnie {times['serial']:.2f} s, "
+              f"równolegle {times['parallel']:.2f} s")
+
+    result = bench_monthly_grid()
+    print(f"dane heatmap (1000 miast x 10 lat): pivot dla każdego miasta {result['loop']:.2f} s, "
+          f"monthly_grid {result['grid'] * 1e3:.1f} ms, przyspieszenie x{result['speedup']:.0f}")
+
+    for module, info in bench_import_time().items():
+        print(f"import {module}: {info['time'] * 1e3:.0f} ms (bez pandas/numpy), "
+              f"ciężkie biblioteki: {', '.join(info['heavy']) or 'brak'}")
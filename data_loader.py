@@ -1,8 +1,19 @@
 import pandas as pd
-import requests
 import zipfile
-import io
 import re
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import functools
+import numpy as np
+from datetime import datetime
+
+import average_and_limits
 
 """
 data_loader.py
@@ -10,25 +21,379 @@ data_loader.py
 Moduł obsłukuje wczytywanie danych i przygotowuje je do dalszej analizy 
 
 Funkcje:
+- GiosCache: lokalny cache surowych plików z GIOŚ (adresowany zawartością, z usuwaniem LRU)
 - download_gios_archive: pobiera archiwum ZIP i wczytuje arkusz Exel 
-- download_multiple_gios_archives: zarządza wczytywaniem danych  
+- download_clean_gios_archive: zwraca oczyszczoną ramkę dla roku, korzystając z cache przetworzonych danych
+- download_multiple_gios_archives: zarządza wczytywaniem danych (równolegle dla wielu lat)
+- GiosDownloadError: wyjątek z raportem błędów pobierania dla poszczególnych lat
+- download_gios_archive_members: jednokrotnie pobiera archiwum i równolegle wczytuje z niego wiele arkuszy
+- download_multiple_gios_members: wczytuje wiele arkuszy (zanieczyszczenia, czasy uśredniania) dla wielu lat
 - edit_df: czyści dane i ujednolica format w rankach danych 
+- read_gios_sheet: strumieniowo wczytuje arkusz GIOŚ od razu do oczyszczonej ramki (bez ramek pośrednich)
 - download_gios_metadata: pobiera metadane z opisem i lokalizacją stacji, wyczytuje plik exel
+- StationIndex / station_index: indeks kodów stacji (rozwiązane łańcuchy zmian kodów)
+- StationRegistry / station_registry: rejestr atrybutów stacji (miejscowość, województwo, współrzędne, daty)
 - create_code_map: mapuje nowe kody stacji do nowych i koryguje stare kody w ramkach danych
 - multiindex_code_city: Tworzy multiindex z nazwami miejscowości nad kodami stacji 
 - correct_datetime_index: Korekta godziny - przesunięcie z 00:00 na 23:59:59 poprzedniego dnia 
-- save_combined_data: Łączy ramki danych w jeden DataFrame i zapisuje do pliku CSV
+- process_years_parallel: przetwarza lata równolegle w puli procesów (edit_df ... correct_datetime_index)
+- Pipeline: leniwy potok przetwarzania - kroki wykonywane w jednym przebiegu dla każdego roku
+- compact_frame: zamienia ramkę na tryb kompaktowy (float32) o połowę mniejszy w pamięci
+- save_combined_data: Łączy ramki danych w jeden DataFrame i zapisuje do pliku (CSV, CSV.GZ, Parquet, Feather)
+- completeness_report: raport brakujących dni i godzin dla lat i stacji
+- write_combined_data: zapisuje scaloną ramkę danych w wybranym formacie
+- read_combined_data: wczytuje scaloną ramkę (całą, wybrane lata lub stacje) z odtworzeniem indeksów
+- iter_combined_data: zwraca zapisane scalone dane we fragmentach (np. rok po roku)
+- stored_years: zwraca lata zapisane już w pliku ze scalonymi danymi
+- append_combined_data: dopisuje nowe lata do zapisanych scalonych danych
+- update_combined_data: pobiera i przetwarza tylko brakujące lata, a następnie dopisuje je do zapisanych danych
 """
 
-def download_gios_archive(year, gios_id, filename, gios_archive_url):
+# rozmiar porcji przy strumieniowym zapisie pobieranych plików
+CHUNK_SIZE = 1024 * 1024
+
+# wersja potoku czyszczenia danych - zmiana unieważnia zapisane w cache przetworzone ramki
+PIPELINE_VERSION = 2
+
+
+def _requests():
+    # moduł requests importowany dopiero przy pierwszym pobieraniu (krótszy start procesów bez pobierania)
+    import requests
+    return requests
+
+
+def __getattr__(name):
+    # leniwy dostęp do modułu z zewnątrz, np. data_loader.requests
+    if name == "requests":
+        return _requests()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _spool_response(response, f):
+    """
+    Zapisuje treść odpowiedzi HTTP (pobranej z `stream=True`) do pliku porcjami, bez trzymania
+    całości w pamięci. Zwraca skrót SHA-256 i rozmiar zapisanych danych.
+    """
+    sha = hashlib.sha256()
+    size = 0
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        sha.update(chunk)
+        f.write(chunk)
+        size += len(chunk)
+    return sha.hexdigest(), size
+
+
+def _download_to_tempfile(url):
+    """
+    Pobiera plik strumieniowo do anonimowego pliku tymczasowego.
+
+    Returns:
+        file: Otwarty plik tymczasowy ustawiony na początek (usuwany po zamknięciu).
+
+    Raises:
+        requests.exceptions.HTTPError: Jeśli wystąpi problem z połączeniem lub zasób nie istnieje.
+    """
+    response = _requests().get(url, stream=True)
+    try:
+        response.raise_for_status()
+        f = tempfile.TemporaryFile()
+        try:
+            _spool_response(response, f)
+            f.seek(0)
+        except BaseException:
+            f.close()
+            raise
+    finally:
+        response.close()
+    return f
+
+
+class GiosCache:
+    """
+    Lokalny cache na dysku dla plików pobieranych z GIOŚ (archiwa ZIP, metadane XLSX).
+
+    Zawartość plików przechowywana jest pod nazwą będącą skrótem SHA-256 (cache adresowany zawartością),
+    a indeks `index.json` przypisuje adres URL do skrótu oraz nagłówków ETag/Last-Modified.
+    Po przekroczeniu limitu rozmiaru usuwane są najdawniej używane wpisy (LRU).
+
+    Oprócz surowych plików cache przechowuje też oczyszczone ramki danych (wynik `edit_df`)
+    w binarnym formacie NumPy `.npz`, dzięki czemu kolejne uruchomienia nie parsują ponownie plików Excel.
+    Ramki wliczane są do limitu rozmiaru i usuwane razem z archiwum, z którego powstały.
+
+    Domyślnie plik obecny w cache jest zwracany bez żadnego zapytania sieciowego (archiwa z lat
+    historycznych nie zmieniają się). Przy `revalidate=True` wysyłane jest zapytanie warunkowe,
+    a w trybie `offline=True` sieć nie jest używana wcale.
+
+    Args:
+        directory (str | Path): Katalog cache. Domyślnie `.gios_cache` w bieżącym katalogu.
+        max_bytes (int): Maksymalny łączny rozmiar przechowywanych plików. Domyślnie 2 GB.
+        offline (bool): Tryb bez sieci - brak pliku w cache kończy się błędem.
+        revalidate (bool): Czy sprawdzać aktualność pliku na serwerze (ETag/Last-Modified).
+    """
+
+    def __init__(self, directory=".gios_cache", max_bytes=2 * 1024**3, offline=False, revalidate=False):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.revalidate = revalidate
+        self._lock = threading.RLock()
+        (self.directory / "blobs").mkdir(parents=True, exist_ok=True)
+        (self.directory / "frames").mkdir(parents=True, exist_ok=True)
+        self._index_path = self.directory / "index.json"
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if not self._index_path.exists():
+            return {}
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}  # uszkodzony indeks - zaczynamy od pustego cache
+
+    def _save_index(self):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
+
+    def _update_index(self, change):
+        # zmiana wykonywana na aktualnym indeksie z dysku: inne instancje cache w tym samym katalogu
+        # (również w innych procesach) mogły go zmienić, więc ich wpisy nie mogą zostać nadpisane
+        with self._lock:
+            self._index = self._load_index()
+            change(self._index)
+            self._save_index()
+
+    def blob_path(self, sha256):
+        """Zwraca ścieżkę do pliku o podanym skrócie SHA-256."""
+        return self.directory / "blobs" / sha256
+
+    def get_entry(self, url):
+        """
+        Zwraca wpis indeksu dla adresu URL (słownik z kluczami sha256, size, etag, last_modified)
+        lub None, jeśli plik nie jest przechowywany w cache.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:  # wpis mógł dodać inny obiekt cache korzystający z tego katalogu
+                self._index = self._load_index()
+                entry = self._index.get(url)
+            if entry is not None and not self.blob_path(entry["sha256"]).exists():
+                self._update_index(lambda index: index.pop(url, None))
+                entry = None
+            return dict(entry) if entry is not None else None
+
+    def _touch(self, url):
+        def touch(index):
+            if url in index:
+                index[url]["last_access"] = time.time()
+
+        self._update_index(touch)
+
+    def _store(self, response):
+        # zapis strumieniowy do pliku tymczasowego z jednoczesnym liczeniem skrótu
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                digest, size = _spool_response(response, f)
+            os.replace(tmp, self.blob_path(digest))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return digest, size
+
+    def _frame_sizes(self):
+        # rozmiary zapisanych ramek według skrótu archiwum, z którego powstały (prefiks nazwy pliku)
+        sizes = {}
+        for path in (self.directory / "frames").glob("*.npz"):
+            sha = path.stem.split("-", 1)[0] if "-" in path.stem else None
+            try:
+                sizes.setdefault(sha, []).append((path, path.stat().st_size))
+            except OSError:
+                pass  # plik usunięty w międzyczasie
+        return sizes
+
+    def _evict(self, index, keep):
+        # usuwanie najdawniej używanych wpisów (archiwum razem z ramkami z niego przetworzonymi),
+        # aż łączny rozmiar archiwów i ramek zmieści się w limicie
+        frames = self._frame_sizes()
+        shas = {e["sha256"] for e in index.values()}
+        for sha in set(frames) - shas:  # ramki bez archiwum w indeksie
+            for path, _ in frames.pop(sha):
+                path.unlink(missing_ok=True)
+        sizes = {e["sha256"]: e["size"] + sum(size for _, size in frames.get(e["sha256"], []))
+                 for e in index.values()}
+        total = sum(sizes.values())
+        keep_sha = index[keep]["sha256"] if keep in index else None
+        for url, entry in sorted(index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            sha = entry["sha256"]
+            if url == keep or sha == keep_sha:
+                continue
+            del index[url]
+            if all(e["sha256"] != sha for e in index.values()):
+                self._remove_blob(sha)
+                total -= sizes[sha]
+
+    def _remove_blob(self, sha):
+        # usunięcie archiwum razem z ramkami z niego przetworzonymi
+        self.blob_path(sha).unlink(missing_ok=True)
+        for path in (self.directory / "frames").glob(f"{sha}-*.npz"):
+            path.unlink(missing_ok=True)
+
+    def fetch(self, url):
+        """
+        Zwraca ścieżkę do lokalnej kopii pliku spod adresu URL, w razie potrzeby pobierając go.
+
+        Args:
+            url (str): Adres URL pliku.
+
+        Returns:
+            Path: Ścieżka do pliku w cache.
+
+        Raises:
+            FileNotFoundError: Jeśli w trybie offline pliku nie ma w cache.
+            requests.exceptions.HTTPError: Jeśli wystąpi problem z połączeniem lub zasób nie istnieje.
+        """
+        entry = self.get_entry(url)
+        if entry is not None and (self.offline or not self.revalidate):
+            self._touch(url)
+            return self.blob_path(entry["sha256"])
+        if self.offline:
+            raise FileNotFoundError(f"Brak pliku {url} w cache (tryb offline).")
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = _requests().get(url, headers=headers, stream=True)
+        try:
+            if entry is not None and response.status_code == 304:  # plik się nie zmienił
+                self._touch(url)
+                return self.blob_path(entry["sha256"])
+            response.raise_for_status()
+            digest, size = self._store(response)
+        finally:
+            response.close()
+
+        def add(index):
+            previous = index.get(url)
+            if previous is not None and previous["sha256"] != digest:  # nowa zawartość po revalidacji
+                old_sha = previous["sha256"]
+                if all(e["sha256"] != old_sha for key, e in index.items() if key != url):
+                    self._remove_blob(old_sha)
+            index[url] = {
+                "sha256": digest,
+                "size": size,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "last_access": time.time(),
+            }
+            self._evict(index, keep=url)
+
+        self._update_index(add)
+        return self.blob_path(digest)
+
+
+    def frame_key(self, url, member):
+        """
+        Zwraca klucz przetworzonej ramki: skrót archiwum oraz skrót zawartości archiwum, nazwy pliku
+        w archiwum i wersji potoku `PIPELINE_VERSION`. Zwraca None, jeśli archiwum nie ma w cache.
+        """
+        entry = self.get_entry(url)
+        if entry is None:
+            return None
+        raw = f"{entry['sha256']}:{member}:{PIPELINE_VERSION}"
+        # prefiks ze skrótem archiwum - ramki usuwane są razem z archiwum (patrz `_evict`)
+        return f"{entry['sha256']}-{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def load_frame(self, key):
+        """
+        Wczytuje zapisaną ramkę danych o podanym kluczu.
+
+        Returns:
+            pd.DataFrame: Ramka danych z DatetimeIndex lub None, jeśli nie ma jej w cache.
+        """
+        path = self.directory / "frames" / f"{key}.npz"
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            df = pd.DataFrame(
+                npz["values"],
+                index=pd.DatetimeIndex(npz["index"], name=meta["index_name"]),
+                columns=pd.Index(npz["columns"].tolist(), dtype=meta["columns_dtype"], name=meta["columns_name"]),
+                copy=False,
+            )
+        dtypes = dict(zip(df.columns, meta["dtypes"]))
+        if any(dtype != "float64" for dtype in meta["dtypes"]):
+            df = df.astype(dtypes)
+        return df
+
+    def store_frame(self, key, df):
+        """
+        Zapisuje ramkę danych z DatetimeIndex (wynik `edit_df`) w formacie `.npz`.
+        """
+        meta = {
+            "index_name": df.index.name,
+            "columns_name": df.columns.name,
+            "columns_dtype": str(df.columns.dtype),
+            "dtypes": [str(dtype) for dtype in df.dtypes],
+        }
+        path = self.directory / "frames" / f"{key}.npz"
+        fd, tmp = tempfile.mkstemp(dir=self.directory / "frames", suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                values=df.to_numpy(dtype="float64"),
+                index=df.index.values,
+                columns=np.array([str(col) for col in df.columns], dtype=str),
+                meta=np.array(json.dumps(meta), dtype=str),
+            )
+        os.replace(tmp, path)
+
+        # ramki wliczane są do limitu rozmiaru - archiwum, z którego powstała ramka, nie jest usuwane
+        sha = key.split("-", 1)[0]
+        self._update_index(lambda index: self._evict(
+            index, keep=next((url for url, e in index.items() if e["sha256"] == sha), None)))
+
+
+def _open_archive(url, cache):
+    # archiwum z cache (plik na dysku) lub pobrane strumieniowo do pliku tymczasowego
+    if cache is not None:
+        return open(cache.fetch(url), "rb")
+    return _download_to_tempfile(url)
+
+
+def _read_sheet(f, clean, dtype):
+    # wspólne wczytanie arkusza: oczyszczona ramka (strumieniowo) lub surowy arkusz
+    if clean:
+        return read_gios_sheet(f, dtype=dtype)
+    return pd.read_excel(f, header=None)
+
+
+def download_gios_archive(year, gios_id, filename, gios_archive_url, cache=None, clean=False, dtype="float64"):
     """
-    Funkcja pobiera archiwum ZIP dla podanego roku z GIOŚ, rozpakowuje je w pamięci i wczytuje arkusz Excel. 
+    Funkcja pobiera archiwum ZIP dla podanego roku z GIOŚ i wczytuje z niego arkusz Excel. 
+
+    Archiwum jest pobierane strumieniowo do pliku tymczasowego (lub czytane z cache), a z archiwum
+    dekompresowany jest tylko wskazany plik `filename` - całe archiwum nie jest buforowane w pamięci.
     
     Args:
         year (list[int]): rok dla którgo pobierane są dane
         gios_id (str): id zaspobu 
         filename (str): nazwa pliku (.xlsx) wewnątrz pobranego archiwum ZIP.
         gios_archive_url (str): bazowy adres URL punktu końcowego archiwum GIOŚ
+        cache (GiosCache, optional): cache surowych plików; jeśli podany, archiwum jest czytane z dysku
+        clean (bool, optional): czy wczytać arkusz strumieniowo od razu do oczyszczonej ramki
+            (wynik jak z `edit_df`, patrz `read_gios_sheet`). Domyślnie False - surowy arkusz.
+        dtype (str, optional): typ wartości pomiarów przy `clean=True` ("float64" lub "float32")
     
     Returns:
         pd.DataFrame: ramka danych z pomiarami godzinowymi wartości PM2.5 dla danego roku
@@ -38,14 +403,12 @@ def download_gios_archive(year, gios_id, filename, gios_archive_url):
         requests.exceptions.HTTPError: Jeśli wystąpi problem z połączeniem lub zasób nie istnieje.
 
     """
-    # Pobranie archiwum ZIP do pamięci
-  
     url = f"{gios_archive_url}{gios_id}"
-    response = requests.get(url)
-    response.raise_for_status()  # jeśli błąd HTTP, zatrzymaj
+    source = _open_archive(url, cache)  # jeśli błąd HTTP, zatrzymaj
     
-    # Otwórz zip w pamięci
-    with zipfile.ZipFile(io.BytesIO(response.content)) as z:
+    df = None
+    # Otwórz zip bezpośrednio na pliku
+    with source, zipfile.ZipFile(source) as z:
         # znajdź właściwy plik z PM2.5
         if not filename:
             print(f"Błąd: nie znaleziono {filename}.")
@@ -53,88 +416,374 @@ def download_gios_archive(year, gios_id, filename, gios_archive_url):
             # wczytaj plik do pandas
             with z.open(filename) as f:
                 try:
-                    df = pd.read_excel(f, header=None)
+                    df = _read_sheet(f, clean, dtype)
                 except Exception as e:
                     print(f"Błąd przy wczytywaniu {year}: {e}")
     return df
 
 
-def download_multiple_gios_archives(years, gios_ids, filenames, gios_archive_url=None):
+def download_clean_gios_archive(year, gios_id, filename, gios_archive_url, cache):
+    """
+    Funkcja zwraca oczyszczoną ramkę danych (wynik `edit_df`) dla podanego roku.
+
+    Jeśli w cache jest już ramka przetworzona z tego samego archiwum i w tej samej wersji potoku,
+    jest ona wczytywana z pliku `.npz` bez ponownego parsowania arkusza Excel.
+
+    Args:
+        year (int): rok dla którego pobierane są dane
+        gios_id (str): id zasobu
+        filename (str): nazwa pliku (.xlsx) wewnątrz archiwum ZIP
+        gios_archive_url (str): bazowy adres URL punktu końcowego archiwum GIOŚ
+        cache (GiosCache): cache surowych plików i przetworzonych ramek
+
+    Returns:
+        pd.DataFrame: oczyszczona ramka danych z DatetimeIndex lub None w przypadku błędu
+    """
+    url = f"{gios_archive_url}{gios_id}"
+    cache.fetch(url)
+    key = cache.frame_key(url, filename)
+    df = cache.load_frame(key)
+    if df is None:
+        df = download_gios_archive(year, gios_id, filename, gios_archive_url, cache=cache, clean=True)
+        if df is None:
+            return None
+        cache.store_frame(key, df)
+    return df
+
+
+class GiosDownloadError(Exception):
+    """
+    Wyjątek zgłaszany, gdy nie udało się pobrać danych dla co najmniej jednego roku (lub pliku z archiwum).
+
+    Attributes:
+        errors (dict): Słownik mapujący rok (lub klucz (rok, zanieczyszczenie, uśrednianie)) na wyjątek,
+            który wystąpił przy pobieraniu.
+        data (dict): Słownik z ramkami danych pobranymi poprawnie, z takimi samymi kluczami.
+    """
+
+    def __init__(self, errors, data):
+        self.errors = errors
+        self.data = data
+        details = "; ".join(f"{key}: {err}" for key, err in sorted(errors.items(), key=lambda item: str(item[0])))
+        super().__init__(f"Nie udało się pobrać danych dla: {details}")
+
+
+def download_multiple_gios_archives(years, gios_ids, filenames, gios_archive_url=None, max_workers=None, cache=None,
+                                    clean=False, dtype="float64"):
     """
     Jest to funkcja nadrzędna, która zarządza procesem wczytywania danych dla wielu lat.
+
+    Archiwa dla poszczególnych lat pobierane są równolegle w puli wątków. Błąd dla jednego roku
+    nie przerywa pobierania pozostałych - po zakończeniu zgłaszany jest zbiorczy wyjątek
+    z informacją, które lata się nie powiodły.
     
     Args: 
         years (list[int]): Lista lat do pobrania
         gios_id (dict): Słownik przypisujący identyfikator pliku w bazie GIOŚ (wartość) do roku (klucz)
         file_names (dict): Słownik przypisujący nazwę pliku .xlsx (wartość) do roku (klucz)
         gios_archive_url (str, optional): Podstawowy adres URL API GIOŚ. Domyślna wartość to None
+        max_workers (int, optional): Liczba równoległych pobrań. Domyślnie None - jeden wątek na rok.
+            Wartość 1 oznacza pobieranie sekwencyjne.
+        cache (GiosCache, optional): Cache surowych archiwów. Domyślnie None - bez cache.
+        clean (bool, optional): Czy od razu zwrócić dane oczyszczone przez `edit_df`. Z podanym cache
+            oczyszczone ramki są zapisywane i wczytywane z cache. Domyślnie False.
+        dtype (str, optional): Typ wartości pomiarów przy `clean=True`; "float32" to tryb kompaktowy.
     
     Returns:
-        dict : Słownik mapujący ramki danych do każdego roku {rok: df}.
+        dict : Słownik mapujący ramki danych do każdego roku {rok: df} (surowe lub oczyszczone, zależnie od `clean`).
+
+    Raises:
+        GiosDownloadError: Jeśli dla któregoś roku pobieranie lub wczytywanie się nie powiodło.
     """
     if gios_archive_url is None:
         gios_archive_url = "https://powietrze.gios.gov.pl/pjp/archives/downloadFile/"
 
+    years = list(years)
+    if max_workers is None:
+        max_workers = max(len(years), 1)
+
+    def fetch(year):
+        if clean and cache is not None:
+            df = download_clean_gios_archive(year, gios_ids[year], filenames[year], gios_archive_url, cache)
+            return compact_frame(df, dtype) if df is not None else None
+        return download_gios_archive(year, gios_ids[year], filenames[year], gios_archive_url, cache=cache,
+                                     clean=clean, dtype=dtype)
+
     data = {}
-    for year in years:
-        df = download_gios_archive(year, gios_ids[year], filenames[year], gios_archive_url)
-        data[year] = df
-    
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {year: executor.submit(fetch, year) for year in years}
+        for year in years:  # zachowujemy kolejność lat z listy wejściowej
+            try:
+                df = futures[year].result()
+            except Exception as e:
+                errors[year] = e
+                continue
+            if df is None:
+                errors[year] = ValueError(f"nie wczytano pliku {filenames[year]}")
+            else:
+                data[year] = df
+
+    if errors:
+        raise GiosDownloadError(errors, data)
+
     return data
 
 
 
 
+def download_gios_archive_members(year, gios_id, members, gios_archive_url, cache=None, max_workers=None,
+                                  clean=True, dtype="float64"):
+    """
+    Funkcja pobiera archiwum ZIP dla roku jeden raz i wczytuje z niego równolegle wiele arkuszy
+    (np. różne zanieczyszczenia i czasy uśredniania).
+
+    Args:
+        year (int): rok dla którego pobierane są dane
+        gios_id (str): id zasobu
+        members (dict): Słownik przypisujący nazwę pliku .xlsx w archiwum (wartość) do pary
+            (zanieczyszczenie, uśrednianie) (klucz), np. {("PM25", "1g"): "2024_PM25_1g.xlsx"}.
+            Nazwa może zawierać pole `{year}`, np. "{year}_PM25_1g.xlsx".
+        gios_archive_url (str): bazowy adres URL punktu końcowego archiwum GIOŚ
+        cache (GiosCache, optional): cache surowych plików i przetworzonych ramek
+        max_workers (int, optional): Liczba równolegle wczytywanych arkuszy. Domyślnie jeden wątek na arkusz.
+        clean (bool, optional): Czy zwrócić oczyszczone ramki (jak z `edit_df`). Domyślnie True.
+        dtype (str, optional): Typ wartości pomiarów przy `clean=True`.
+
+    Returns:
+        dict: Słownik {(rok, zanieczyszczenie, uśrednianie): df}.
+
+    Raises:
+        GiosDownloadError: Jeśli wczytanie któregoś arkusza się nie powiodło.
+        requests.exceptions.HTTPError: Jeśli wystąpi problem z połączeniem lub zasób nie istnieje.
+    """
+    url = f"{gios_archive_url}{gios_id}"
+    filenames = {key: filename.format(year=year) for key, filename in members.items()}
+    use_frame_cache = cache is not None and clean and dtype == "float64"
+
+    data = {}
+    missing = dict(filenames)
+    if use_frame_cache:  # ramki przetworzone wcześniej wczytujemy bez otwierania archiwum
+        cache.fetch(url)
+        for key, filename in filenames.items():
+            df = cache.load_frame(cache.frame_key(url, filename))
+            if df is not None:
+                data[key] = df
+                del missing[key]
+
+    errors = {}
+    if missing:
+        def read(filename):
+            with z.open(filename) as f:
+                return _read_sheet(f, clean, dtype)
+
+        # ZipFile pozwala na równoległe czytanie różnych plików z jednego archiwum
+        with _open_archive(url, cache) as source, zipfile.ZipFile(source) as z:
+            with ThreadPoolExecutor(max_workers=max_workers or len(missing)) as executor:
+                futures = {key: executor.submit(read, filename) for key, filename in missing.items()}
+                for key, future in futures.items():
+                    try:
+                        data[key] = future.result()
+                    except Exception as e:
+                        errors[key] = e
+                        continue
+                    if use_frame_cache:
+                        cache.store_frame(cache.frame_key(url, missing[key]), data[key])
+
+    data = {(year, *key): data[key] for key in filenames if key in data}  # kolejność jak w `members`
+    if errors:
+        raise GiosDownloadError({(year, *key): err for key, err in errors.items()}, data)
+    return data
+
+
+def download_multiple_gios_members(years, gios_ids, members, gios_archive_url=None, max_workers=None, cache=None,
+                                   clean=True, dtype="float64"):
+    """
+    Funkcja wczytuje wiele arkuszy (zanieczyszczenia, czasy uśredniania) dla wielu lat.
+    Archiwum każdego roku jest pobierane tylko raz, a lata przetwarzane są równolegle.
+
+    Args:
+        years (list[int]): Lista lat do pobrania
+        gios_ids (dict): Słownik przypisujący identyfikator pliku w bazie GIOŚ (wartość) do roku (klucz)
+        members (dict): Słownik {(zanieczyszczenie, uśrednianie): nazwa pliku}, nazwa może zawierać pole
+            `{year}`. Można też podać słownik {rok: {(zanieczyszczenie, uśrednianie): nazwa pliku}}.
+        gios_archive_url (str, optional): Podstawowy adres URL API GIOŚ. Domyślna wartość to None
+        max_workers (int, optional): Liczba równolegle przetwarzanych lat. Domyślnie jeden wątek na rok.
+        cache (GiosCache, optional): Cache surowych archiwów i przetworzonych ramek.
+        clean (bool, optional): Czy zwrócić oczyszczone ramki (jak z `edit_df`). Domyślnie True.
+        dtype (str, optional): Typ wartości pomiarów przy `clean=True`.
+
+    Returns:
+        dict: Słownik {(rok, zanieczyszczenie, uśrednianie): df}.
+
+    Raises:
+        GiosDownloadError: Jeśli dla któregoś roku lub arkusza wczytywanie się nie powiodło.
+    """
+    if gios_archive_url is None:
+        gios_archive_url = "https://powietrze.gios.gov.pl/pjp/archives/downloadFile/"
+
+    years = list(years)
+
+    def fetch(year):
+        year_members = members[year] if year in members else members
+        return download_gios_archive_members(year, gios_ids[year], year_members, gios_archive_url,
+                                             cache=cache, clean=clean, dtype=dtype)
+
+    data = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(years), 1)) as executor:
+        futures = {year: executor.submit(fetch, year) for year in years}
+        for year in years:
+            try:
+                data.update(futures[year].result())
+            except GiosDownloadError as e:
+                data.update(e.data)
+                errors.update(e.errors)
+            except Exception as e:
+                errors[year] = e
+
+    if errors:
+        raise GiosDownloadError(errors, data)
+    return data
+
+
+# wzorzec daty i godziny do usuwania niepotrzebnych wierszy
+PATTERN_DATE = r"\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}"
+
+
+def _to_numeric_block(values):
+    """
+    Konwertuje cały blok wartości (tablica 2D) na float64 w jednej operacji.
+    Wartości tekstowe z przecinkiem dziesiętnym są zamieniane na liczby, a niepoprawne na NaN.
+    """
+    try:
+        return values.astype("float64")  # szybka ścieżka: same liczby / puste komórki
+    except (ValueError, TypeError):
+        pass
+    # pomiary mają niewiele unikalnych wartości - konwertujemy tylko je, a wynik rozkładamy kodami
+    codes, uniques = pd.factorize(values.ravel())
+    uniques = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.replace(",", ".", regex=False)
+    converted = np.append(pd.to_numeric(uniques, errors="coerce").to_numpy(dtype="float64"), np.nan)
+    return converted[codes].reshape(values.shape)  # kod -1 (brak wartości) wskazuje na dopisany NaN
+
+
+def _edit_one_df(df):
+    """
+    Czyści pojedynczą surową ramkę danych z arkusza GIOŚ (patrz `edit_df`).
+    Wiersze klasyfikowane są wektorowo: maska nagłówka 'Kod stacji' i maska wierszy z datą.
+    """
+    first_col = df.iloc[:, 0].astype(str)
+    header_rows = np.flatnonzero((first_col == "Kod stacji").to_numpy())
+    if len(header_rows) == 0:
+        raise ValueError("Nie znaleziono wiersza 'Kod stacji' z kodami stacji.")
+    header_row_id = header_rows[-1]
+    is_date = first_col.str.match(PATTERN_DATE, na=False).to_numpy()
+
+    data = df.iloc[is_date]  # tylko wiersze z pomiarami
+    index = pd.DatetimeIndex(pd.to_datetime(data.iloc[:, 0])).floor("h")  # zaokrąglenie do pełnej godziny w dół
+    index.name = "Kod stacji"
+    values = _to_numeric_block(data.iloc[:, 1:].to_numpy())
+    columns = pd.Index(df.iloc[header_row_id, 1:].tolist())
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
 def edit_df(df_dict):
     """
     Funkcja usuwa niepotrzebne wiersze i ujednolica strukturę danych
     Proces obejmuje usuwanie wierszy opisowych, zaokrąglanie czasu do pełnych godzin (w dół)
     i ustawienie daty jako indeksu. 
+
+    Wiersze są klasyfikowane wektorowo (maska nagłówka i maska wierszy z datą), a cały blok
+    pomiarów jest konwertowany na float64 w jednej operacji.
     
     Args:
         df_dict (dict): słownik mapujący surowe dane w ramkach danych do roku {rok: df}
     
     Returns:
         dict : słownik mapujący ramki danych z oczyszczonymi danymi i DatetimeIndex do roku {rok: df}.
+
+    Raises:
+        ValueError: Jeśli w ramce danych brak wiersza 'Kod stacji' z kodami stacji.
     """
-    out = {} 
+    return {year: _edit_one_df(df) for year, df in df_dict.items()}
 
-    for year, df in df_dict.items():
-        df_edited = df.copy()
-        pattern_date = re.compile(r"\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}") # wzorzec daty i godziny do usuwania niepotrzebnych wierszy
-        rows_to_drop = []
-        header_row_id = None
-
-        for i in range(len(df_edited)):
-            
-            row = df_edited.iloc[i, 0]
-            if row == 'Kod stacji': # znalezienie indeksu z kodami stacji (aby ustawić jako nagłówki kolumn)
-                header_row_id = i
-            elif not pattern_date.match(str(row)):
-                rows_to_drop.append(i)
-
-        df_edited.drop(labels=rows_to_drop, axis=0, inplace=True) # usuń niepotrzebne wiersze
-        df_edited.columns = df.loc[header_row_id] # ustaw nagłówki kolumn
-        df_edited.drop(labels=[header_row_id], axis=0, inplace=True) # usuń wiersz z nagłówkami
-        df_edited.reset_index(drop=True, inplace=True) # zresetuj indeksy
-        df_edited['Kod stacji'] = pd.to_datetime(df_edited['Kod stacji']) # zmień typ kolumny z kodami stacji na datetime
-        df_edited['Kod stacji'] = df_edited['Kod stacji'].dt.floor('h') # zaokrąglij do najbliższej godziny w dół
-        df_edited.set_index('Kod stacji', inplace=True) # ustaw kolumnę z kodami stacji jako indeks
-        # Zamiana przecinka na kropkę i konwersja wszystkich kolumn na liczby
-        for col in df_edited.columns:
-            df_edited[col] = pd.to_numeric(df_edited[col].astype(str).str.replace(',', '.'), errors='coerce')
-    
-        out[year] = df_edited
 
-    return out
+def read_gios_sheet(source, dtype="float64"):
+    """
+    Funkcja strumieniowo wczytuje arkusz GIOŚ i od razu zwraca oczyszczoną ramkę danych (jak `edit_df`).
 
+    Wiersze arkusza są czytane jednokrotnie w trybie tylko do odczytu. Po znalezieniu wiersza 'Kod stacji'
+    pomiary zapisywane są bezpośrednio do prealokowanej tablicy NumPy, a daty do tablicy datetime64,
+    bez tworzenia pośrednich ramek typu object.
 
-def download_gios_metadata(url):
+    Args:
+        source (str | Path | file): Plik .xlsx (ścieżka lub obiekt plikowy).
+        dtype (str, optional): Typ wartości pomiarów, "float64" (domyślnie) lub "float32".
+
+    Returns:
+        pd.DataFrame: Ramka danych z pomiarami i DatetimeIndex zaokrąglonym do pełnych godzin.
+
+    Raises:
+        ValueError: Jeśli w arkuszu brak wiersza 'Kod stacji' z kodami stacji.
+    """
+    import openpyxl  # import przy pierwszym wczytaniu arkusza
+
+    pattern_date = re.compile(PATTERN_DATE)
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+
+        columns = None
+        for row in rows:  # wiersze opisowe przed nagłówkiem są pomijane
+            if row and row[0] == "Kod stacji":
+                columns = list(row[1:])
+                break
+        if columns is None:
+            raise ValueError("Nie znaleziono wiersza 'Kod stacji' z kodami stacji.")
+
+        n_cols = len(columns)
+        capacity = max(ws.max_row or 0, 1)
+        values = np.empty((capacity, n_cols), dtype=dtype)
+        index = np.empty(capacity, dtype="datetime64[us]")
+        n = 0
+        for row in rows:
+            first = row[0] if row else None
+            if isinstance(first, datetime):
+                stamp = np.datetime64(first, "us")
+            elif isinstance(first, str) and pattern_date.match(first):
+                stamp = pd.Timestamp(first).to_datetime64()
+            else:
+                continue  # wiersze opisowe po nagłówku
+            if n == capacity:  # arkusz bez poprawnego wymiaru - powiększamy tablice
+                capacity *= 2
+                values = np.resize(values, (capacity, n_cols))
+                index = np.resize(index, capacity)
+            index[n] = stamp
+            cells = row[1:n_cols + 1]
+            try:
+                values[n, :len(cells)] = cells  # None -> NaN
+            except (ValueError, TypeError):  # np. tekst z przecinkiem dziesiętnym
+                values[n, :len(cells)] = _to_numeric_block(np.array(cells, dtype=object)[None, :])[0]
+            values[n, len(cells):] = np.nan
+            n += 1
+    finally:
+        wb.close()
+
+    if n < capacity:
+        values = values[:n].copy() if capacity - n > n // 10 else values[:n]
+    dates = pd.DatetimeIndex(index[:n]).floor("h")  # zaokrąglenie do pełnej godziny w dół
+    dates.name = "Kod stacji"
+    return pd.DataFrame(values, index=dates, columns=pd.Index(columns), copy=False)
+
+
+def download_gios_metadata(url, cache=None):
     """
     Funkcja pobiera plik Excel z metadanymi stacji pomiarowych (lokalizacje, kody)
     
     Args:
         url (str): Adres URL do pliku Excel z metadanymi.
+        cache (GiosCache, optional): Cache surowych plików. Domyślnie None - bez cache.
     
     Returns:
         pd.DataFrame: Ramka danych z metadanymi lub None w przypadku błędu.
@@ -142,9 +791,11 @@ def download_gios_metadata(url):
     Rises: 
         requests.exceptions.HTTPError: Jeśli wystąpi problem z połączeniem lub zasób nie istnieje.
     """
-    response = requests.get(url)
-    response.raise_for_status()
-    with io.BytesIO(response.content) as f:
+    if cache is not None:
+        source = open(cache.fetch(url), "rb")
+    else:
+        source = _download_to_tempfile(url)
+    with source as f:
         try:
             gios_metadata = pd.read_excel(f, header=0)
             return gios_metadata
@@ -153,11 +804,261 @@ def download_gios_metadata(url):
             return None
 
 
+OLD_CODE_COLUMN = 'Stary Kod stacji \n(o ile inny od aktualnego)'
+STATION_COLUMNS = [OLD_CODE_COLUMN, 'Kod stacji']
+
+_station_indexes = {}  # indeksy stacji zbudowane w tym procesie, według skrótu metadanych
+
+
+class StationIndex:
+    """
+    Indeks tożsamości stacji zbudowany jednorazowo z metadanych GIOŚ.
+
+    Przechowuje słownik (tablicę haszującą) {dowolny dawny kod: aktualny kod} z rozwiązanymi
+    łańcuchami zmian kodów (A→B w jednym wierszu metadanych i B→C w innym daje A→C), więc zamiana
+    kodu to jedno wyszukanie. Atrybuty stacji (miejscowość, województwo, ...) przechowuje `StationRegistry`.
+
+    Indeks można zapisać do pliku JSON (`save`) obok cache danych i wczytać (`load`) bez ponownego
+    parsowania metadanych. Zwykle tworzony jest przez `station_index`, który zapamiętuje indeksy
+    w obrębie procesu.
+
+    Args:
+        aliases (dict): Słownik {dawny kod: aktualny kod} (łańcuchy zostaną rozwiązane).
+        fingerprint (str, optional): Skrót metadanych, z których zbudowano indeks.
+    """
+
+    def __init__(self, aliases, fingerprint=None):
+        self.aliases = self._resolve_chains(aliases)
+        self.fingerprint = fingerprint
+        self._alias_index = pd.Index(list(self.aliases.keys()))
+        self._alias_targets = np.array(list(self.aliases.values()), dtype=object)
+
+    @staticmethod
+    def _resolve_chains(aliases):
+        # każdy kod wskazuje bezpośrednio na ostatni kod w łańcuchu (z ochroną przed cyklami)
+        resolved = {}
+        for old in aliases:
+            seen = {old}
+            code = aliases[old]
+            while code in aliases and code not in seen:
+                seen.add(code)
+                code = aliases[code]
+            if code != old:
+                resolved[old] = code
+        return resolved
+
+    @staticmethod
+    def fingerprint_of(gios_metadata, columns=STATION_COLUMNS):
+        """Zwraca skrót SHA-256 kolumn metadanych wykorzystywanych przez indeks."""
+        columns = [column for column in columns if column in gios_metadata.columns]
+        hashes = pd.util.hash_pandas_object(gios_metadata[columns].astype(str), index=False)
+        raw = hashlib.sha256(hashes.to_numpy().tobytes())
+        raw.update(json.dumps(columns).encode("utf-8"))
+        return raw.hexdigest()
+
+    @classmethod
+    def from_metadata(cls, gios_metadata, fingerprint=None):
+        """
+        Buduje indeks z metadanych (wynik `download_gios_metadata`).
+
+        Args:
+            gios_metadata (pd.DataFrame): Tabela metadanych stacji.
+            fingerprint (str, optional): Skrót metadanych, jeśli został już obliczony.
+
+        Returns:
+            StationIndex: Nowy indeks.
+        """
+        aliases = {}
+        if OLD_CODE_COLUMN in gios_metadata.columns:
+            codes = gios_metadata[[OLD_CODE_COLUMN, 'Kod stacji']].dropna()
+            # stare kody rozdzielone przecinkami, każdy w osobnym wierszu
+            old_codes = codes[OLD_CODE_COLUMN].str.split(',').explode().str.strip()
+            aliases = dict(zip(old_codes, codes['Kod stacji'].loc[old_codes.index]))
+
+        if fingerprint is None:
+            fingerprint = cls.fingerprint_of(gios_metadata)
+        return cls(aliases, fingerprint)
+
+    def resolve(self, codes):
+        """
+        Zamienia kody stacji (tablica, lista lub Index) na aktualne kody; kody nieznane pozostają bez zmian.
+
+        Returns:
+            np.ndarray: Aktualne kody stacji w kolejności wejścia.
+        """
+        codes = np.asarray(codes, dtype=object)
+        if not self.aliases:
+            return codes
+        positions = self._alias_index.get_indexer(codes)
+        return np.where(positions >= 0, self._alias_targets[positions], codes)
+
+    def save(self, path):
+        """Zapisuje indeks do pliku JSON."""
+        data = {"fingerprint": self.fingerprint, "aliases": self.aliases}
+        path = Path(path)
+        tmp = path.with_name(path.name + ".part")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje indeks zapisany metodą `save`."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["aliases"], data["fingerprint"])
+
+
+def station_index(gios_metadata, cache=None):
+    """
+    Zwraca indeks stacji dla metadanych, budując go tylko raz w danym procesie.
+
+    Indeksy zapamiętywane są według skrótu metadanych. Jeśli podano `cache`, indeks jest też
+    zapisywany w katalogu cache (`stations/<skrót>.json`) i wczytywany stamtąd w kolejnych uruchomieniach.
+
+    Args:
+        gios_metadata (pd.DataFrame): Tabela metadanych stacji.
+        cache (GiosCache, optional): Cache, w którym przechowywać indeks. Domyślnie None.
+
+    Returns:
+        StationIndex: Indeks stacji.
+    """
+    fingerprint = StationIndex.fingerprint_of(gios_metadata)
+    index = _station_indexes.get(fingerprint)
+    if index is None:
+        path = None
+        if cache is not None:
+            path = cache.directory / "stations" / f"{fingerprint}.json"
+            path.parent.mkdir(exist_ok=True)
+        try:
+            index = StationIndex.load(path) if path is not None else None
+        except (OSError, ValueError, KeyError):
+            index = None  # brak lub uszkodzony plik - budujemy od nowa
+        if index is None:
+            index = StationIndex.from_metadata(gios_metadata, fingerprint)
+            if path is not None:
+                index.save(path)
+        _station_indexes[fingerprint] = index
+    return index
+
+
+REGISTRY_COLUMNS = ['Miejscowość', 'Województwo', 'WGS84 φ N', 'WGS84 λ E', 'Data uruchomienia', 'Data zamknięcia']
+
+_station_registries = {}  # rejestry stacji zbudowane w tym procesie, według skrótów kodów i atrybutów
+
+
+class StationRegistry:
+    """
+    Rejestr atrybutów stacji (miejscowość, województwo, współrzędne, daty działania) zbudowany
+    jednorazowo z metadanych GIOŚ (wynik `download_gios_metadata`).
+
+    Wyszukiwanie atrybutów dla tablic kodów stacji jest wektorowe (indeks haszujący pandas), a dawne
+    kody stacji zamieniane są na aktualne przez `StationIndex`. MultiIndex kolumn (Miejscowość, Kod stacji)
+    zapamiętywany jest dla każdego zestawu kolumn, więc lata o tych samych stacjach korzystają z tego
+    samego obiektu. Zwykle tworzony przez `station_registry`, który zapamiętuje rejestry w obrębie procesu.
+
+    Args:
+        gios_metadata (pd.DataFrame): Tabela metadanych stacji.
+        index (StationIndex, optional): Indeks kodów stacji. Domyślnie `station_index(gios_metadata)`.
+    """
+
+    def __init__(self, gios_metadata, index=None):
+        self.index = index if index is not None else station_index(gios_metadata)
+        columns = [column for column in REGISTRY_COLUMNS if column in gios_metadata.columns]
+        table = (
+            gios_metadata[['Kod stacji'] + columns]
+            .dropna(subset=['Kod stacji'])
+            .drop_duplicates(subset=['Kod stacji'])
+            .set_index('Kod stacji')
+        )
+        for column in ('WGS84 φ N', 'WGS84 λ E'):
+            if column in table.columns:
+                table[column] = pd.to_numeric(table[column], errors='coerce')
+        for column in ('Data uruchomienia', 'Data zamknięcia'):
+            if column in table.columns:
+                table[column] = pd.to_datetime(table[column], errors='coerce')
+        self.table = table
+        self._multiindexes = {}
+
+    def lookup(self, codes, column):
+        """
+        Zwraca wartości kolumny metadanych dla kodów stacji (dawne kody są zamieniane na aktualne).
+
+        Args:
+            codes (array-like): Kody stacji.
+            column (str): Kolumna metadanych, np. 'Miejscowość'.
+
+        Returns:
+            np.ndarray: Wartości w kolejności kodów; dla nieznanych stacji brak danych (NaN/NaT).
+        """
+        return self.table[column].reindex(self.index.resolve(codes)).to_numpy()
+
+    def city(self, codes):
+        """Zwraca miejscowości stacji."""
+        return self.lookup(codes, 'Miejscowość')
+
+    def voivodeship(self, codes):
+        """Zwraca województwa stacji."""
+        return self.lookup(codes, 'Województwo')
+
+    def coordinates(self, codes):
+        """Zwraca tablicę (liczba stacji x 2) współrzędnych WGS84 (szerokość N, długość E)."""
+        return np.column_stack([self.lookup(codes, 'WGS84 φ N'), self.lookup(codes, 'WGS84 λ E')])
+
+    def active_dates(self, codes):
+        """Zwraca ramkę z datami uruchomienia i zamknięcia stacji (indeks - podane kody)."""
+        return pd.DataFrame(
+            {column: self.lookup(codes, column) for column in ('Data uruchomienia', 'Data zamknięcia')},
+            index=pd.Index(codes, name='Kod stacji'),
+        )
+
+    def multiindex(self, codes):
+        """
+        Zwraca MultiIndex (Miejscowość, Kod stacji) dla kodów stacji, zapamiętany dla danego zestawu kodów.
+
+        Raises:
+            KeyError: Jeśli dla któregoś kodu brak miejscowości w metadanych.
+        """
+        key = tuple(codes)
+        if key not in self._multiindexes:
+            cities = self.city(codes)
+            missing = pd.isna(cities)
+            if missing.any():
+                raise KeyError(f"Brak miejscowości w metadanych dla stacji: {list(np.asarray(codes)[missing])}")
+            self._multiindexes[key] = pd.MultiIndex.from_arrays(
+                [pd.Index(cities, name='Miejscowość'), pd.Index(codes)],
+                names=['Miejscowość', 'Kod stacji'],
+            )
+        return self._multiindexes[key]
+
+
+def station_registry(gios_metadata):
+    """
+    Zwraca rejestr stacji dla metadanych, budując go tylko raz w danym procesie.
+
+    Rejestr zapamiętywany jest według skrótu indeksu kodów (`station_index`) i skrótu kolumn
+    atrybutów, więc każda kolumna metadanych haszowana jest tylko raz.
+
+    Args:
+        gios_metadata (pd.DataFrame): Tabela metadanych stacji.
+
+    Returns:
+        StationRegistry: Rejestr stacji.
+    """
+    index = station_index(gios_metadata)
+    key = (index.fingerprint, StationIndex.fingerprint_of(gios_metadata, REGISTRY_COLUMNS))
+    registry = _station_registries.get(key)
+    if registry is None:
+        registry = _station_registries[key] = StationRegistry(gios_metadata, index)
+    return registry
+
+
 def create_code_map(gios_metadata, df_dict):
     """
     Mapuje nowe kody stacji do starych i aktualizuje nazwy kolumn w ramkach danych.
 
-    Dba o spójność identyfikatorów stacji w przypadku zmian nazewnictwa na przestrzeni lat.
+    Dba o spójność identyfikatorów stacji w przypadku zmian nazewnictwa na przestrzeni lat,
+    również gdy kod zmieniał się kilkukrotnie (patrz `StationIndex`).
 
     Args:
         gios_metadata (pd.DataFrame): Tabela metadanych zawierająca kolumny z kodami.
@@ -167,18 +1068,7 @@ def create_code_map(gios_metadata, df_dict):
         dict: Zaktualizowany słownik z ujednoliconymi nazwami stacji w ramkach danych.
     
     """
-    codes = gios_metadata[['Stary Kod stacji \n(o ile inny od aktualnego)', 'Kod stacji']]
-    codes = codes.dropna()
-
-    # rozdzielamy stare kody przecinkami
-    codes['Stary_Kod_List'] = codes['Stary Kod stacji \n(o ile inny od aktualnego)'].str.split(',')
-
-    # każdy stary kod w osobnym wierszu
-    codes_long = codes.explode('Stary_Kod_List')
-    codes_long['Stary_Kod_List'] = codes_long['Stary_Kod_List'].str.strip()
-
-
-    code_map = dict(zip(codes_long['Stary_Kod_List'], codes_long['Kod stacji']))
+    code_map = station_index(gios_metadata).aliases
 
     for df in df_dict.values():
         df.rename(columns=code_map, inplace=True)
@@ -198,34 +1088,29 @@ def multiindex_code_city(df_dict, metadata):
     Returns:
         dict: Słownik ramek danych z MultiIndexem na kolumnach.
     """
-    meta = (
-        metadata[['Kod stacji', 'Miejscowość']]
-        .dropna()
-        .drop_duplicates()
-        .set_index('Kod stacji')
-    )
+    registry = station_registry(metadata)
 
     out = {}
 
     for year, df in df_dict.items():
-        # zachowujemy kolejność kolumn DF
-        cities = meta.loc[df.columns, 'Miejscowość']
+        out[year] = _with_city_level(df.copy(), registry)
 
-        df_new = df.copy()
-        df_new.columns = pd.MultiIndex.from_arrays(
-            [cities, df.columns],
-            names=['Miejscowość', 'Kod stacji']
-        )
+    return out
 
-        out[year] = df_new
 
-    return out
+def _with_city_level(df, registry):
+    # zachowujemy kolejność kolumn DF
+    df.columns = registry.multiindex(df.columns)
+    return df
 
 
 def correct_datetime_index(df_dict):
     """
     Funkcja koryguje indeks czasu, przesuwając rekordy z godziny 00:00:00 na 23:59:59 poprzedniego dnia.
 
+    Przesunięcie wykonywane jest bezpośrednio na buforze int64 indeksu datetime64 (bez TimedeltaIndex),
+    a nowy indeks korzysta z wynikowej tablicy bez kopiowania. Indeks nie może mieć strefy czasowej.
+
     Args:
         df_dict (dict): Słownik ramek danych z DatetimeIndex zmapowanych do analizowanych lat.
 
@@ -233,41 +1118,714 @@ def correct_datetime_index(df_dict):
         dict: Słownik z poprawionymi indeksami czasowymi.
     """
     for year, df in df_dict.items():
-        df.index = df.index - pd.to_timedelta((df.index.hour == 0).astype(int), unit='s')
+        _shift_midnight(df)
     return df_dict
 
 
-def save_combined_data(df_dict, filename):
+def _shift_midnight(df):
+    values = df.index.values
+    ticks = values.view("int64")
+    per_day = average_and_limits._ticks_per_day(values.dtype)
+    per_second = np.timedelta64(1, "s") // np.timedelta64(1, np.datetime_data(values.dtype)[0])
+    shifted = ticks.copy()
+    shifted[ticks % per_day == 0] -= per_second
+    df.index = pd.DatetimeIndex(shifted.view(values.dtype), name=df.index.name, copy=False)
+    return df
+
+
+def _process_year(source, code_map=None, registry=None, dtype="float64", keep=None, shift=True):
+    # pełne przetwarzanie jednego roku w jednym przebiegu (jak ciąg funkcji dla słownika ramek)
+    if callable(source):
+        source = source()  # leniwe pobranie danych
+    if isinstance(source, pd.DataFrame):
+        if isinstance(source.index, pd.DatetimeIndex):  # ramka już oczyszczona
+            df = source.copy(deep=False)  # bez kopiowania danych, ale bez zmiany ramki wejściowej
+        else:
+            df = _edit_one_df(source)
+    else:
+        df = read_gios_sheet(source, dtype=dtype)
+    if code_map is not None:
+        df.rename(columns=code_map, inplace=True)
+    if keep is not None:  # wybór stacji przed dalszymi krokami - kopiowany jest tylko wybrany fragment
+        df = df.loc[:, df.columns.isin(keep)]
+    if dtype != "float64":
+        df = compact_frame(df, dtype)
+    if registry is not None:
+        df = _with_city_level(df, registry)
+    if shift:
+        df = _shift_midnight(df)
+    return df
+
+
+_worker_options = {}  # mapa kodów, rejestr i typ danych przekazane raz do procesu roboczego
+
+
+def _init_year_worker(code_map, registry, dtype):
+    # inicjalizacja procesu roboczego - metadane przesyłane raz na proces, a nie z każdym rokiem
+    _worker_options.update(code_map=code_map, registry=registry, dtype=dtype)
+
+
+def _process_year_in_worker(source):
+    return _process_year(source, **_worker_options)
+
+
+def process_years_parallel(sources, gios_metadata, max_workers=None, dtype="float64"):
+    """
+    Funkcja przetwarza dane z wielu lat równolegle w puli procesów.
+
+    Dla każdego roku w osobnym procesie wykonywane są kolejno kroki `edit_df` (lub strumieniowe
+    `read_gios_sheet` dla pliku .xlsx), `create_code_map`, `multiindex_code_city` i `correct_datetime_index`.
+    Metadane są przygotowywane raz w procesie głównym i przesyłane raz do każdego procesu roboczego
+    (przy jego uruchomieniu). Wynik jest taki sam jak dla wywołań sekwencyjnych.
+
+    Najmniej danych przesyłanych jest między procesami, gdy źródłem są ścieżki do plików .xlsx -
+    wtedy arkusze są wczytywane w procesach roboczych, a z powrotem przesyłany jest tylko
+    jednolity blok liczb (float64/float32) każdej ramki. Surowe ramki danych mają kolumny typu object
+    (tekst i liczby z arkusza) i są serializowane element po elemencie, co jest wyraźnie wolniejsze.
+
+    Args:
+        sources (dict): Słownik {rok: źródło}, gdzie źródłem jest surowa ramka danych (jak z
+            `download_multiple_gios_archives`) albo ścieżka do pliku .xlsx z arkuszem GIOŚ.
+        gios_metadata (pd.DataFrame): Metadane stacji.
+        max_workers (int, optional): Liczba procesów. Domyślnie None - liczba procesorów.
+        dtype (str, optional): Typ wartości pomiarów ("float64" lub "float32"). Domyślnie "float64".
+
+    Returns:
+        dict: Słownik {rok: df} gotowy do `save_combined_data`.
+    """
+    code_map = station_index(gios_metadata).aliases
+    registry = station_registry(gios_metadata)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_year_worker,
+                             initargs=(code_map, registry, dtype)) as executor:
+        futures = {year: executor.submit(_process_year_in_worker, source) for year, source in sources.items()}
+        return {year: future.result() for year, future in futures.items()}
+
+
+class Pipeline:
+    """
+    Leniwy potok przetwarzania danych GIOŚ, zastępujący ręczny ciąg wywołań
+    `download_multiple_gios_archives` → `edit_df` → `create_code_map` → `multiindex_code_city` →
+    `correct_datetime_index` → `save_combined_data`.
+
+    Metody kroków (`map_codes`, `add_cities`, `correct_datetime`, `select`, `compact`) tylko zapisują
+    konfigurację i zwracają nowy potok. Obliczenia wykonują dopiero metody końcowe (`iter_years`,
+    `collect`, `combine`, `monthly_mean`): każdy rok jest wczytywany i przetwarzany w jednym przebiegu,
+    bez słowników pośrednich ramek, a wybór stacji (`select`) jest wykonywany zaraz po wczytaniu,
+    więc dalsze kroki dotyczą tylko potrzebnych kolumn. Kroki wykonywane są zawsze w kolejności
+    jak w ręcznym ciągu wywołań, niezależnie od kolejności ich dodania.
+
+    Przykład - średnie miesięczne tylko dla dwóch miast:
+
+        (Pipeline.from_gios(years, gios_ids, filenames)
+            .map_codes(metadata).add_cities(metadata).correct_datetime()
+            .select(cities=["Warszawa", "Katowice"])
+            .monthly_mean(by="Miejscowość"))
+
+    Args:
+        sources (dict): Słownik {rok: źródło}; źródłem jest surowa lub oczyszczona ramka danych,
+            ścieżka do pliku .xlsx albo funkcja bez argumentów zwracająca ramkę (wywoływana leniwie).
+    """
+
+    def __init__(self, sources, _options=None):
+        self.sources = dict(sources)
+        self._options = dict(_options or {})
+
+    @classmethod
+    def from_gios(cls, years, gios_ids, filenames, gios_archive_url=None, cache=None):
+        """
+        Tworzy potok, którego źródłem są archiwa GIOŚ. Archiwum danego roku pobierane jest dopiero
+        podczas przetwarzania tego roku, a arkusz wczytywany strumieniowo (`read_gios_sheet`).
+
+        Args:
+            years (list[int]): Lista lat.
+            gios_ids (dict): Słownik przypisujący identyfikator pliku w bazie GIOŚ (wartość) do roku (klucz)
+            filenames (dict): Słownik przypisujący nazwę pliku .xlsx (wartość) do roku (klucz)
+            gios_archive_url (str, optional): Podstawowy adres URL API GIOŚ. Domyślna wartość to None
+            cache (GiosCache, optional): Cache surowych archiwów i przetworzonych ramek.
+
+        Returns:
+            Pipeline: Nowy potok.
+        """
+        if gios_archive_url is None:
+            gios_archive_url = "https://powietrze.gios.gov.pl/pjp/archives/downloadFile/"
+        sources = {}
+        for year in years:
+            if cache is not None:
+                sources[year] = functools.partial(download_clean_gios_archive, year, gios_ids[year],
+                                                  filenames[year], gios_archive_url, cache)
+            else:
+                sources[year] = functools.partial(download_gios_archive, year, gios_ids[year], filenames[year],
+                                                  gios_archive_url, clean=True)
+        return cls(sources)
+
+    def _with(self, **options):
+        return Pipeline(self.sources, {**self._options, **options})
+
+    def map_codes(self, gios_metadata):
+        """Dodaje krok zamiany starych kodów stacji na aktualne (jak `create_code_map`)."""
+        return self._with(code_metadata=gios_metadata)
+
+    def add_cities(self, metadata):
+        """Dodaje krok tworzenia MultiIndexu kolumn (Miejscowość, Kod stacji) (jak `multiindex_code_city`)."""
+        return self._with(city_metadata=metadata)
+
+    def correct_datetime(self):
+        """Dodaje krok przesunięcia godziny 00:00:00 na 23:59:59 poprzedniego dnia (jak `correct_datetime_index`)."""
+        return self._with(shift=True)
+
+    def select(self, cities=None, stations=None):
+        """
+        Ogranicza dane do wybranych miejscowości i/lub kodów stacji (aktualnych, po `map_codes`).
+        Wybór miejscowości wymaga kroku `add_cities`.
+        """
+        return self._with(cities=cities, stations=stations)
+
+    def compact(self, dtype="float32"):
+        """Dodaje krok zamiany wartości na tryb kompaktowy (jak `compact_frame`)."""
+        return self._with(dtype=dtype)
+
+    def _prepare(self):
+        # metadane przygotowywane raz dla wszystkich lat
+        options = self._options
+        code_map = station_index(options["code_metadata"]).aliases if "code_metadata" in options else None
+        registry = station_registry(options["city_metadata"]) if "city_metadata" in options else None
+        keep = None
+        if options.get("cities") is not None:
+            if registry is None:
+                raise ValueError("Wybór miejscowości wymaga kroku add_cities.")
+            table = registry.table
+            keep = set(table.index[table['Miejscowość'].isin(options["cities"])])
+        if options.get("stations") is not None:
+            stations = set(options["stations"])
+            keep = stations if keep is None else keep & stations
+        return dict(code_map=code_map, registry=registry, dtype=options.get("dtype", "float64"), keep=keep,
+                    shift=options.get("shift", False))
+
+    def iter_years(self):
+        """
+        Przetwarza kolejne lata, zwracając pary (rok, ramka danych). W pamięci jest naraz tylko jeden rok.
+
+        Yields:
+            tuple[int, pd.DataFrame]: Rok i przetworzona ramka danych.
+        """
+        settings = self._prepare()
+        for year, source in self.sources.items():
+            yield year, _process_year(source, **settings)
+
+    def collect(self):
+        """Wykonuje potok i zwraca słownik {rok: df}."""
+        return dict(self.iter_years())
+
+    def combine(self, filename=None, format=None, compact=False):
+        """
+        Wykonuje potok i scala lata w jedną ramkę (join='inner', jak `save_combined_data`).
+        Jeśli podano `filename`, wynik jest też zapisywany (patrz `write_combined_data`).
+        """
+        if filename is not None:
+            return save_combined_data(self.collect(), filename, compact=compact, format=format)
+        df_all = pd.concat([df for _, df in self.iter_years()], join='inner', ignore_index=False)
+        return compact_frame(df_all) if compact else df_all
+
+    def monthly_mean(self, by=None):
+        """
+        Wykonuje potok i zwraca tylko średnie miesięczne (jak `average_and_limits.monthly_mean` na
+        scalonych danych). Dla każdego roku zapamiętywane są tylko miesięczne sumy i liczby pomiarów,
+        więc pełna scalona ramka nie powstaje. Miesiące podzielone między lata (godzina 00:00:00
+        1 stycznia po `correct_datetime`) są sumowane.
+
+        Args:
+            by (str | dict | pd.Series, optional): Grupowanie stacji, np. 'Miejscowość' (patrz
+                `average_and_limits.group_mean`). Domyślnie None - średnie dla stacji.
+
+        Returns:
+            pd.DataFrame: Średnie miesięczne z MultiIndexem ['rok', 'miesiąc'].
+        """
+        sums, counts = [], []
+        for _, df in self.iter_years():
+            keys = [df.index.year, df.index.month]
+            sums.append(df.groupby(keys).sum().astype("float64"))
+            counts.append(df.notna().groupby(keys).sum())
+        sums = pd.concat(sums, join='inner').groupby(level=[0, 1]).sum()
+        counts = pd.concat(counts, join='inner').groupby(level=[0, 1]).sum()
+        monthly = sums / counts  # brak pomiarów -> NaN
+        monthly.index.names = ['rok', 'miesiąc']
+        if by is not None:
+            return average_and_limits.group_mean(monthly, by)
+        return monthly
+
+
+def compact_frame(df, dtype="float32"):
+    """
+    Funkcja zamienia ramkę danych z pomiarami na tryb kompaktowy: wartości float32 w jednym bloku.
+
+    Zużycie pamięci spada o połowę względem float64. Braki pomiarów pozostają zapisane jako NaN,
+    które w float32 pełni rolę maski braków bez dodatkowej pamięci. Indeks czasu i kolumny
+    (MultiIndex przechowuje poziomy 'Miejscowość'/'Kod stacji' jako unikalne wartości i kody całkowite,
+    czyli tak jak typ kategoryczny) pozostają bez zmian, więc funkcje z `average_and_limits`
+    działają na ramce kompaktowej bez modyfikacji - dokładność wyników opisuje moduł `average_and_limits`.
+
+    Args:
+        df (pd.DataFrame): Ramka danych z pomiarami.
+        dtype (str, optional): Typ wartości w trybie kompaktowym. Domyślnie "float32".
+
+    Returns:
+        pd.DataFrame: Ramka danych z tym samym indeksem i kolumnami oraz wartościami typu `dtype`.
+    """
+    if (df.dtypes == dtype).all():
+        return df
+    return pd.DataFrame(df.to_numpy(dtype=dtype), index=df.index, columns=df.columns, copy=False)
+
+
+def _flat_columns(columns):
+    # nazwy kolumn do zapisu w formatach kolumnowych (MultiIndex -> "Miejscowość|Kod stacji")
+    if isinstance(columns, pd.MultiIndex):
+        return ["|".join(map(str, col)) for col in columns]
+    return [str(col) for col in columns]
+
+
+def _flat_frame(df):
+    # ramka z płaskimi nazwami kolumn i indeksem czasu jako kolumną "_czas"
+    return df.set_axis(_flat_columns(df.columns), axis=1).rename_axis("_czas").reset_index()
+
+
+def _write_csv(df, path):
+    df.to_csv(path, index=True)
+
+
+def _write_csv_gz(df, path):
+    df.to_csv(path, index=True, compression="gzip")
+
+
+def _write_feather(df, path):
+    _flat_frame(df).to_feather(path)
+
+
+def _write_parquet(df, path):
+    # katalog z osobnym plikiem dla każdego roku: <path>/year=2024.parquet
+    path.mkdir(parents=True, exist_ok=True)
+    for old in path.glob("year=*.parquet"):
+        old.unlink()
+    flat = _flat_frame(df)
+    for year, part in flat.groupby(_data_years(flat["_czas"])):
+        part.to_parquet(path / f"year={year}.parquet", index=False)
+
+
+def _data_years(times):
+    # rok pomiaru dla każdego wiersza: pomiar z 00:00:00 kończy godzinę poprzedniego dnia (jak w arkuszach
+    # GIOŚ), więc dane bez korekty `correct_datetime_index` kończące się 1 stycznia 00:00 należą do swojego roku
+    return np.asarray((pd.DatetimeIndex(times) - pd.Timedelta(seconds=1)).year)
+
+
+def _csv_header_rows(meta):
+    # wiersze nagłówka: po jednym na poziom kolumn oraz wiersz z nazwą indeksu dla MultiIndexu
+    n_header = len(meta["column_names"])
+    if n_header > 1 and meta["index_name"] is not None:
+        n_header += 1
+    return n_header
+
+
+def _csv_frame(df, meta, columns):
+    # fragment wczytany z CSV -> płaskie nazwy kolumn i indeks datetime
+    df.index = pd.to_datetime(df.index)
+    df.columns = _flat_columns(_meta_columns(meta))
+    return df[_flat_columns(columns)]
+
+
+def _read_csv(path, meta, columns, years):
+    # round_trip - wartości odczytywane dokładnie tak, jak zostały zapisane (bez dryfu przy dopisywaniu)
+    df = pd.read_csv(path, header=None, skiprows=_csv_header_rows(meta), index_col=0, float_precision="round_trip")
+    return _csv_frame(df, meta, columns)
+
+
+def _read_feather(path, meta, columns, years):
+    return pd.read_feather(path, columns=["_czas"] + _flat_columns(columns)).set_index("_czas")
+
+
+def _read_parquet(path, meta, columns, years):
+    files = sorted(path.glob("year=*.parquet"))
+    if years is not None:
+        files = [f for f in files if int(f.stem.split("=")[1]) in set(years)]
+    parts = [pd.read_parquet(f, columns=["_czas"] + _flat_columns(columns)) for f in files]
+    return pd.concat(parts, ignore_index=True).set_index("_czas")
+
+
+# formaty zapisu scalonych danych: nazwa -> (funkcja zapisu, funkcja odczytu)
+# Parquet i Feather wymagają pakietu pyarrow.
+STORE_FORMATS = {
+    "csv": (_write_csv, _read_csv),
+    "csv.gz": (_write_csv_gz, _read_csv),
+    "feather": (_write_feather, _read_feather),
+    "parquet": (_write_parquet, _read_parquet),
+}
+
+# rozpoznawanie formatu po rozszerzeniu pliku
+STORE_SUFFIXES = {".csv.gz": "csv.gz", ".gz": "csv.gz", ".feather": "feather", ".parquet": "parquet", ".csv": "csv"}
+
+
+def _store_format(path, format):
+    if format is not None:
+        if format not in STORE_FORMATS:
+            raise ValueError(f"Nieznany format zapisu: {format}. Dostępne: {', '.join(STORE_FORMATS)}")
+        return format
+    for suffix, fmt in STORE_SUFFIXES.items():
+        if str(path).endswith(suffix):
+            return fmt
+    return "csv"
+
+
+def _meta_columns(meta):
+    # kolumny (MultiIndex lub Index) odtworzone z pliku opisu
+    if len(meta["column_names"]) > 1:
+        return pd.MultiIndex.from_tuples([tuple(col) for col in meta["columns"]], names=meta["column_names"])
+    return pd.Index([col[0] for col in meta["columns"]], name=meta["column_names"][0])
+
+
+def _meta_path(path, format):
+    # plik z opisem kolumn i indeksu zapisywany obok danych
+    return path / "_meta.json" if format == "parquet" else path.with_name(path.name + ".meta.json")
+
+
+def _existing_meta_path(path):
+    # istniejący plik opisu niezależnie od rozszerzenia ścieżki (katalog Parquet lub plik obok danych)
+    for candidate in (path / "_meta.json", path.with_name(path.name + ".meta.json")):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def write_combined_data(df_all, path, format=None):
+    """
+    Funkcja zapisuje scaloną ramkę danych w wybranym formacie wraz z opisem kolumn i indeksu,
+    który pozwala `read_combined_data` odtworzyć dokładnie MultiIndex kolumn i DatetimeIndex.
+
+    Args:
+        df_all (pd.DataFrame): Scalona ramka danych z DatetimeIndex.
+        path (str | Path): Ścieżka pliku (dla Parquet - katalogu z plikami dla poszczególnych lat).
+        format (str, optional): "csv", "csv.gz", "feather" lub "parquet" (partycjonowany po latach).
+            Domyślnie None - format rozpoznawany po rozszerzeniu, w pozostałych przypadkach CSV.
+
+    Raises:
+        ValueError: Jeśli podano nieznany format.
+    """
+    path = Path(path)
+    fmt = _store_format(path, format)
+    dtypes = df_all.dtypes.unique()
+    meta = {
+        "format": fmt,
+        "index_name": df_all.index.name,
+        "index_dtype": str(df_all.index.dtype),
+        "column_names": list(df_all.columns.names),
+        "columns": [list(col) if isinstance(col, tuple) else [col] for col in df_all.columns],
+        "dtype": str(dtypes[0]) if len(dtypes) == 1 else None,
+        "years": sorted(np.unique(_data_years(df_all.index)).tolist()),
+    }
+    STORE_FORMATS[fmt][0](df_all, path)
+    with open(_meta_path(path, fmt), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def read_combined_data(path, years=None, stations=None, format=None):
+    """
+    Funkcja wczytuje scaloną ramkę danych zapisaną przez `write_combined_data`/`save_combined_data`.
+
+    Dla Parquet wczytywane są tylko pliki wybranych lat, a dla Parquet i Feather tylko kolumny
+    wybranych stacji.
+
+    Args:
+        path (str | Path): Ścieżka pliku lub katalogu z danymi.
+        years (list[int], optional): Lata do wczytania. Domyślnie None - wszystkie.
+        stations (list[str], optional): Kody stacji (poziom 'Kod stacji') do wczytania. Domyślnie None - wszystkie.
+        format (str, optional): Format danych. Domyślnie None - odczytany z pliku opisu.
+
+    Returns:
+        pd.DataFrame: Ramka danych z odtworzonym MultiIndexem kolumn i DatetimeIndex.
+    """
+    path = Path(path)
+    meta = _read_meta(path)
+    if meta is None:
+        raise FileNotFoundError(f"Brak zapisanych danych: {path}")
+    fmt = _store_format(path, format) if format is not None else meta["format"]
+
+    columns = _meta_columns(meta)
+    if stations is not None:
+        codes = columns.get_level_values(-1)
+        columns = columns[codes.isin(list(stations))]
+
+    df = _restore_frame(STORE_FORMATS[fmt][1](path, meta, columns, years), meta, columns)
+    if years is not None and fmt != "parquet":
+        df = df[np.isin(_data_years(df.index), list(years))]
+    return df
+
+
+def _restore_frame(df, meta, columns):
+    # odtworzenie kolumn, indeksu czasu i typu wartości zapisanych w pliku opisu
+    df.columns = columns
+    df.index = df.index.astype(meta["index_dtype"]).rename(meta["index_name"])
+    if meta["dtype"] is not None and (df.dtypes != meta["dtype"]).any():
+        df = df.astype(meta["dtype"])
+    return df
+
+
+def iter_combined_data(path, stations=None, format=None, chunksize=24 * 366):
+    """
+    Generator zwracający zapisane scalone dane we fragmentach, bez wczytywania całości do pamięci.
+
+    Dla Parquet fragmentem jest jeden rok (jeden plik), dla CSV/CSV.GZ kolejne `chunksize` wierszy,
+    a dla Feather kolejne bloki rekordów zapisane w pliku. Fragment może zaczynać się lub kończyć
+    w środku dnia - agregaty częściowe (np. `AggregationCube.from_chunks`) muszą to uwzględniać.
+
+    Args:
+        path (str | Path): Ścieżka pliku lub katalogu z danymi.
+        stations (list[str], optional): Kody stacji do wczytania. Domyślnie None - wszystkie.
+        format (str, optional): Format danych. Domyślnie None - odczytany z pliku opisu.
+        chunksize (int, optional): Liczba wierszy fragmentu dla CSV. Domyślnie godziny jednego roku.
+
+    Yields:
+        pd.DataFrame: Kolejne fragmenty danych z MultiIndexem kolumn i DatetimeIndex.
+
+    Raises:
+        FileNotFoundError: Jeśli pod ścieżką nie ma zapisanych danych.
+    """
+    path = Path(path)
+    meta = _read_meta(path)
+    if meta is None:
+        raise FileNotFoundError(f"Brak zapisanych danych: {path}")
+    fmt = meta["format"]
+    columns = _meta_columns(meta)
+    if stations is not None:
+        columns = columns[columns.get_level_values(-1).isin(list(stations))]
+
+    if fmt == "parquet":
+        for year in stored_years(path, fmt):
+            yield read_combined_data(path, years=[year], stations=stations, format=fmt)
+    elif fmt == "feather":
+        import pyarrow.ipc  # pyarrow jest wymagany dla formatu Feather
+
+        with pyarrow.ipc.open_file(path) as reader:
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(["_czas"] + _flat_columns(columns))
+                yield _restore_frame(batch.to_pandas().set_index("_czas"), meta, columns)
+    else:
+        with pd.read_csv(path, header=None, skiprows=_csv_header_rows(meta), index_col=0,
+                         float_precision="round_trip", chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield _restore_frame(_csv_frame(chunk, meta, columns), meta, columns)
+
+
+def save_combined_data(df_dict, filename, compact=False, format=None, validate=False):
     """
     Funkcja scala dany ze wszytskich lat w jednę ramkę danych i zapisuje ją do pliku CSV.
-    Sprawdzą również czy liczba dni w kazdym roku jest prawidłowa.
+    Na życzenie (`validate=True`) sprawdza również kompletność danych (patrz `completeness_report`).
+
+    Dane można też zapisać w formacie CSV.GZ, Feather lub Parquet (partycjonowanym po latach)
+    i wczytać ponownie funkcją `read_combined_data`.
 
     Args:
         df_dict (dict): Słownik ramek danych do połączenia.
-        filename (str): Nazwa docelowego pliku .csv
+        filename (str): Nazwa docelowego pliku .csv (lub .csv.gz, .feather, katalogu .parquet)
+        compact (bool, optional): Czy zwrócić ramkę w trybie kompaktowym (float32, patrz `compact_frame`).
+            Ramki są konwertowane przed scaleniem, więc pełna ramka float64 nie powstaje. Domyślnie False.
+        format (str, optional): Format zapisu (patrz `write_combined_data`). Domyślnie rozpoznawany
+            po rozszerzeniu pliku.
+        validate (bool, optional): Czy wypisać lata z brakującymi dniami lub godzinami. Domyślnie False -
+            zapis nie jest spowalniany sprawdzaniem danych.
 
     Returns:
         pd.DataFrame: Połączona ramka danych ze wszytkich lat.
     """
     df_list = list(df_dict.values())
+    if compact:
+        df_list = [compact_frame(df) for df in df_list]
 
     df_all = pd.concat(df_list, join='inner', ignore_index=False)
-    df_all.to_csv(filename, index=True)
+    write_combined_data(df_all, filename, format=format)
+
+    if validate:
+        years = completeness_report(df_all)["years"]
+        for year, row in years[(years["brakujące_dni"] > 0) | (years["brakujące_godziny"] > 0)].iterrows():
+            print(f"Niekompletne dane za rok {year}: brakuje {row['brakujące_dni']} dni "
+                  f"i {row['brakujące_godziny']} godzin.")
+
+    return df_all
+
+
+def completeness_report(df, years=None):
+    """
+    Funkcja sprawdza kompletność scalonych danych godzinowych dla lat i stacji.
+
+    Dni i lata wyznaczane są z kluczy dni pomiaru (`average_and_limits.measurement_days`), więc pomiar
+    z 23:59:59 (po `correct_datetime_index`) należy do właściwego dnia. Liczności wierszy i dni
+    zliczane są dla lat bezpośrednio, a pomiary stacji jednym grupowaniem wierszy według roku
+    (`groupby(...).count()`), bez tymczasowych kopii całych danych.
+
+    Args:
+        df (pd.DataFrame): Scalona ramka danych (DatetimeIndex, stacje w kolumnach).
+        years (list[int], optional): Lata do sprawdzenia. Domyślnie lata obecne w danych.
+
+    Returns:
+        dict: Raport z kluczami:
+            - "years": pd.DataFrame z indeksem 'rok' i kolumnami 'dni', 'brakujące_dni', 'godziny',
+              'brakujące_godziny' (brakujące wiersze indeksu czasu),
+            - "stations": pd.DataFrame z liczbą brakujących godzin (brak wiersza lub NaN) dla każdej
+              stacji (wiersze, jak kolumny `df`) i roku (kolumny).
+    """
+    days = average_and_limits.measurement_days(df.index)
+    day_years = days.astype("datetime64[D]").astype("datetime64[Y]").astype("int64") + 1970
+    if years is None:
+        years = np.unique(day_years)
+    years = np.asarray(years, dtype="int64")
+
+    year_labels = pd.Index(years, name="rok")
+    hours = pd.Series(day_years).value_counts().reindex(year_labels, fill_value=0).to_numpy()
+    unique_days = np.unique(days)
+    unique_day_years = unique_days.astype("datetime64[D]").astype("datetime64[Y]").astype("int64") + 1970
+    present_days = pd.Series(unique_day_years).value_counts().reindex(year_labels, fill_value=0).to_numpy()
+    expected_days = (
+        (years + 1 - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+        - (years - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+    ).astype("int64")
+    expected_hours = expected_days * 24
+
+    # liczba pomiarów (nie-NaN) dla roku i stacji
+    observed = df.groupby(day_years).count().reindex(year_labels, fill_value=0).to_numpy(dtype="int64")
+    report_years = pd.DataFrame({
+        "dni": present_days,
+        "brakujące_dni": expected_days - present_days,
+        "godziny": hours,
+        "brakujące_godziny": expected_hours - hours,
+    }, index=year_labels)
+    report_stations = pd.DataFrame(
+        (expected_hours[:, None] - observed).T,
+        index=df.columns,
+        columns=year_labels,
+    )
+    return {"years": report_years, "stations": report_stations}
+
+
+def _read_meta(path):
+    # plik opisu zapisanych danych lub None, jeśli dane nie zostały jeszcze zapisane
+    # (położenie pliku opisu nie zależy od rozszerzenia ścieżki - format zapisany jest w opisie)
+    meta_path = _existing_meta_path(Path(path))
+    if meta_path is None:
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stored_years(path, format=None):
+    """
+    Funkcja zwraca lata zapisane w pliku ze scalonymi danymi.
+
+    Args:
+        path (str | Path): Ścieżka pliku lub katalogu z danymi.
+        format (str, optional): Format danych. Domyślnie None - odczytany z pliku opisu.
+
+    Returns:
+        list[int]: Posortowana lista lat lub pusta lista, jeśli danych nie zapisano.
+    """
+    meta = _read_meta(path)
+    if meta is None:
+        return []
+    if "years" not in meta:  # dane zapisane przed dodaniem listy lat do opisu
+        return sorted(np.unique(_data_years(read_combined_data(path, format=format).index)).tolist())
+    return meta["years"]
+
+
+def append_combined_data(df_dict, path, format=None):
+    """
+    Funkcja dopisuje ramki danych z nowych lat do zapisanych scalonych danych.
 
-    # sprawdzenie liczby unikalnych dni w każdym roku
+    Zachowana jest semantyka `join='inner'` z `save_combined_data`: wynik zawiera tylko stacje wspólne
+    dla wszystkich lat. Jeśli nowe lata zawierają wszystkie zapisane stacje, dla formatu Parquet
+    zapisywane są tylko pliki nowych lat; w pozostałych przypadkach zapis jest nadpisywany.
+
+    Args:
+        df_dict (dict): Słownik ramek danych dla nowych lat (przetworzonych jak przed `save_combined_data`).
+        path (str | Path): Ścieżka pliku lub katalogu z danymi.
+        format (str, optional): Format danych. Domyślnie rozpoznawany po rozszerzeniu.
+
+    Returns:
+        pd.DataFrame: Połączona ramka danych ze wszystkich lat.
+
+    Raises:
+        ValueError: Jeśli któryś z dopisywanych lat jest już zapisany.
+    """
+    path = Path(path)
+    meta = _read_meta(path)
+    new_all = pd.concat(list(df_dict.values()), join='inner', ignore_index=False)
+    if meta is None:
+        write_combined_data(new_all, path, format=format)
+        return new_all
 
-    count_days = df_all.index.normalize().unique() # normalizacja do daty (bez godziny)
-    count_days = pd.Series(count_days)
-    count_days = count_days.groupby(count_days.dt.year).count()
+    new_years = set(np.unique(_data_years(new_all.index)).tolist())
+    overlap = new_years & set(stored_years(path, format))
+    if overlap:
+        raise ValueError(f"Lata już zapisane w {path}: {sorted(overlap)}")
 
+    fmt = meta["format"]
+    old_columns = _meta_columns(meta)
+    columns = old_columns[old_columns.isin(new_all.columns)]
+    if fmt == "parquet" and len(columns) == len(old_columns):
+        # stacje bez zmian - dopisujemy tylko pliki nowych lat
+        new_all = new_all[old_columns]
+        if meta["dtype"] is not None:
+            new_all = new_all.astype(meta["dtype"])
+        flat = _flat_frame(new_all)
+        for year, part in flat.groupby(_data_years(flat["_czas"])):
+            part.to_parquet(path / f"year={year}.parquet", index=False)
+        meta["years"] = sorted(set(meta.get("years", [])) | new_years)
+        with open(_meta_path(path, fmt), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return read_combined_data(path)
+
+    old_all = read_combined_data(path, stations=columns.get_level_values(-1))
+    df_all = pd.concat([old_all, new_all], join='inner', ignore_index=False)
+    if not df_all.index.is_monotonic_increasing:
+        df_all = df_all.sort_index(kind="stable")
+    write_combined_data(df_all, path, format=fmt)
     return df_all
 
 
+def update_combined_data(path, years, gios_ids, filenames, gios_metadata, gios_archive_url=None, cache=None,
+                         format=None):
+    """
+    Funkcja w trybie przyrostowym uzupełnia zapisane scalone dane o brakujące lata.
+
+    Pobierane i przetwarzane (`edit_df` → `create_code_map` → `multiindex_code_city` →
+    `correct_datetime_index`) są tylko lata, których nie ma jeszcze w zapisanych danych.
+
+    Args:
+        path (str | Path): Ścieżka pliku lub katalogu ze scalonymi danymi.
+        years (list[int]): Lista wszystkich lat, które mają się znaleźć w danych.
+        gios_ids (dict): Słownik przypisujący identyfikator pliku w bazie GIOŚ (wartość) do roku (klucz)
+        filenames (dict): Słownik przypisujący nazwę pliku .xlsx (wartość) do roku (klucz)
+        gios_metadata (pd.DataFrame): Metadane stacji.
+        gios_archive_url (str, optional): Podstawowy adres URL API GIOŚ. Domyślna wartość to None
+        cache (GiosCache, optional): Cache surowych archiwów i przetworzonych ramek.
+        format (str, optional): Format danych. Domyślnie rozpoznawany po rozszerzeniu.
+
+    Returns:
+        pd.DataFrame: Połączona ramka danych ze wszystkich lat.
+    """
+    stored = set(stored_years(path, format))  # opis danych wczytywany raz
+    missing = [year for year in years if year not in stored]
+    if not missing:
+        return read_combined_data(path, format=format)
+
+    data = download_multiple_gios_archives(missing, gios_ids, filenames, gios_archive_url, cache=cache, clean=True)
+    data = create_code_map(gios_metadata, data)
+    data = multiindex_code_city(data, gios_metadata)
+    data = correct_datetime_index(data)
+    return append_combined_data(data, path, format=format)
+
+
 # Przgotowanie danych do zadania z województwami:
 def prepare_station_voiv_map(metadata, station_col="Kod stacji"):
     """
     Przygotowanie matadanych stacji pomiarowych w postaci mapowania kodu stacji na województwo.
     """    
+    if station_col == "Kod stacji":  # mapowanie z rejestru stacji (metadane parsowane raz)
+        return station_registry(metadata).table["Województwo"].dropna()
     df = metadata[[station_col, "Województwo"]].dropna().drop_duplicates(subset=[station_col])
     return df.set_index(station_col)["Województwo"]
 
@@ -1,6 +1,7 @@
 import matplotlib
 matplotlib.use("Agg") # nie wyświetlaj okienek z wykresami
 
+import json
 import pytest
 import pandas as pd
 import numpy as np
@@ -168,3 +169,887 @@ def test_save_combined_data(tmp_path):
     # sprawdzenie liczby unikalnych dni
     unique_days = combined.index.normalize().unique()
     assert len(unique_days) == 3  # 1 dzień w 2023 i 2 dni w 2024
+
+# TEST 7
+import data_loader
+from data_loader import download_multiple_gios_archives, GiosDownloadError
+
+def test_download_multiple_gios_archives(monkeypatch):
+    """Testuje równoległe pobieranie download_multiple_gios_archives().
+
+    Pobieranie z sieci jest zastąpione funkcją zwracającą ramkę danych lub zgłaszającą błąd.
+    Sprawdza, czy wynik zachowuje strukturę {rok: df} oraz czy błąd jednego roku
+    jest raportowany bez utraty pozostałych lat.
+    """
+    def fake_download(year, gios_id, filename, gios_archive_url, clean=False, **kwargs):
+        if year == 2018:
+            raise ValueError("brak pliku")
+        return pd.DataFrame({"id": [gios_id]})
+
+    monkeypatch.setattr(data_loader, "download_gios_archive", fake_download)
+    ids = {2015: "1", 2018: "2", 2021: "3"}
+    files = {2015: "a.xlsx", 2018: "b.xlsx", 2021: "c.xlsx"}
+
+    data = download_multiple_gios_archives([2015, 2021], ids, files, max_workers=2)
+    assert list(data) == [2015, 2021]
+    assert data[2021].loc[0, "id"] == "3"
+
+    with pytest.raises(GiosDownloadError) as exc:
+        download_multiple_gios_archives([2015, 2018, 2021], ids, files)
+    assert set(exc.value.errors) == {2018}
+    assert set(exc.value.data) == {2015, 2021}
+
+
+# TEST 8
+from data_loader import GiosCache
+
+class FakeResponse:
+    """Minimalna odpowiedź HTTP używana zamiast requests.get w testach cache."""
+
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise data_loader.requests.exceptions.HTTPError(self.status_code)
+
+    def close(self):
+        pass
+
+
+def test_gios_cache(monkeypatch, tmp_path):
+    """Testuje cache GiosCache: brak zapytań sieciowych przy ponownym pobraniu,
+    zapytanie warunkowe (ETag), tryb offline oraz usuwanie wpisów po przekroczeniu limitu."""
+    calls = []
+
+    def fake_get(url, headers=None, stream=False):
+        calls.append((url, headers))
+        if headers and headers.get("If-None-Match") == "v1":
+            return FakeResponse(b"", status_code=304)
+        return FakeResponse(url.encode() * 10, headers={"ETag": "v1"})
+
+    monkeypatch.setattr(data_loader.requests, "get", fake_get)
+
+    cache = GiosCache(tmp_path, max_bytes=50)
+    path = cache.fetch("http://x/1")
+    assert path.read_bytes() == b"http://x/1" * 10
+    assert cache.fetch("http://x/1") == path
+    assert len(calls) == 1  # drugi odczyt bez sieci
+
+    revalidating = GiosCache(tmp_path, max_bytes=50, revalidate=True)
+    assert revalidating.fetch("http://x/1") == path
+    assert calls[-1][1] == {"If-None-Match": "v1"}
+
+    cache.fetch("http://x/2")  # przekroczenie limitu - usunięty najstarszy wpis
+    assert cache.get_entry("http://x/1") is None
+    assert not path.exists()
+
+    offline = GiosCache(tmp_path, offline=True)
+    assert offline.fetch("http://x/2").exists()
+    with pytest.raises(FileNotFoundError):
+        offline.fetch("http://x/1")
+
+
+def test_gios_cache_shared_directory(monkeypatch, tmp_path):
+    """Testuje dwa obiekty GiosCache na tym samym katalogu: żaden nie może nadpisać wpisów drugiego."""
+    monkeypatch.setattr(data_loader.requests, "get", lambda url, **kwargs: FakeResponse(url.encode()))
+
+    first = GiosCache(tmp_path)
+    second = GiosCache(tmp_path)
+    first.fetch("http://x/1")
+    second.fetch("http://x/2")
+    first.fetch("http://x/1")
+
+    index = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+    assert sorted(index) == ["http://x/1", "http://x/2"]
+    assert first.get_entry("http://x/2") is not None  # wpis dodany przez drugi obiekt
+
+
+def test_gios_cache_revalidated_content(monkeypatch, tmp_path):
+    """Testuje, że po revalidacji z nową zawartością poprzednie archiwum i jego ramki są usuwane."""
+    versions = iter(range(5))
+    monkeypatch.setattr(data_loader.requests, "get",
+                        lambda url, **kwargs: FakeResponse(f"wersja {next(versions)}".encode()))
+    frame = pd.DataFrame({"A1": np.arange(3.0)}, index=pd.date_range("2024-01-01", periods=3, freq="h"))
+
+    cache = GiosCache(tmp_path, revalidate=True)
+    for _ in range(5):
+        cache.fetch("http://x/1")
+        cache.store_frame(cache.frame_key("http://x/1", "2024.xlsx"), frame)
+
+    assert len(list((tmp_path / "blobs").iterdir())) == 1
+    assert len(list((tmp_path / "frames").glob("*.npz"))) == 1
+    assert cache.blob_path(cache.get_entry("http://x/1")["sha256"]).read_bytes() == b"wersja 4"
+
+
+def test_gios_cache_frames_eviction(monkeypatch, tmp_path):
+    """Testuje, że ramki .npz wliczane są do limitu cache i usuwane razem ze swoim archiwum."""
+    monkeypatch.setattr(data_loader.requests, "get", lambda url, **kwargs: FakeResponse(url.encode() * 10))
+    frame = pd.DataFrame({"A1": np.arange(100.0)}, index=pd.date_range("2024-01-01", periods=100, freq="h"))
+
+    cache = GiosCache(tmp_path, max_bytes=10_000)
+    cache.fetch("http://x/1")
+    key = cache.frame_key("http://x/1", "2024.xlsx")
+    cache.store_frame(key, frame)
+    frame_path = tmp_path / "frames" / f"{key}.npz"
+    assert frame_path.exists()
+    pd.testing.assert_frame_equal(cache.load_frame(key), frame, check_freq=False)
+
+    cache.max_bytes = frame_path.stat().st_size + 150  # archiwum x/2 i ramka x/1 nie mieszczą się razem
+    cache.fetch("http://x/2")
+    assert cache.get_entry("http://x/1") is None
+    assert not frame_path.exists()
+
+    cache.fetch("http://x/3")
+    key = cache.frame_key("http://x/3", "2024.xlsx")
+    cache.store_frame(key, frame)  # zapis ramki przekracza limit - usunięte starsze archiwum x/2
+    assert cache.get_entry("http://x/2") is None
+    assert cache.get_entry("http://x/3") is not None and cache.load_frame(key) is not None
+
+
+# TEST 9
+from data_loader import download_clean_gios_archive
+
+def test_download_clean_gios_archive(monkeypatch, tmp_path):
+    """Testuje cache przetworzonych ramek w download_clean_gios_archive().
+
+    Drugie wywołanie powinno wczytać ramkę z pliku .npz bez ponownego wczytywania arkusza,
+    a wczytana ramka powinna być identyczna z wynikiem edit_df().
+    """
+    dates = pd.date_range("2023-01-01", periods=48, freq="h")
+    raw = pd.DataFrame(np.arange(96).reshape(48, 2) / 10, columns=["A", "B"])
+    raw.insert(0, "Kod stacji", dates)
+    raw = pd.concat([pd.DataFrame([raw.columns.tolist()], columns=raw.columns), raw], ignore_index=True)
+    raw.columns = range(3)
+    parsed = []
+
+    def fake_download(year, gios_id, filename, gios_archive_url, clean=False, **kwargs):
+        parsed.append(year)
+        return edit_df({year: raw})[year] if clean else raw
+
+    monkeypatch.setattr(data_loader.requests, "get", lambda url, **kwargs: FakeResponse(b"zip"))
+    monkeypatch.setattr(data_loader, "download_gios_archive", fake_download)
+
+    cache = GiosCache(tmp_path)
+    first = download_clean_gios_archive(2023, "1", "a.xlsx", "http://x/", cache)
+    second = download_clean_gios_archive(2023, "1", "a.xlsx", "http://x/", cache)
+
+    assert parsed == [2023]
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(first, edit_df({2023: raw})[2023])
+
+
+# TEST 10
+
+def test_edit_df_gios_sheet():
+    """Testuje edit_df() na arkuszu w formacie GIOŚ.
+
+    Arkusz zawiera wiersze opisowe przed i po wierszu 'Kod stacji', wartości z przecinkiem
+    dziesiętnym oraz puste komórki. Sprawdza nagłówki, zaokrąglenie czasu i konwersję liczb.
+    """
+    df = pd.DataFrame([
+        ["Nr", 1, 2],
+        ["Kod stacji", "A1", "B1"],
+        ["Wskaźnik", "PM2.5", "PM2.5"],
+        ["2023-01-01 01:00:00", "12,5", 3.0],
+        [pd.Timestamp("2023-01-01 02:00:01"), "", "7,25"],
+    ])
+
+    edited = edit_df({2023: df})[2023]
+
+    assert list(edited.columns) == ["A1", "B1"]
+    assert list(edited.index) == [pd.Timestamp("2023-01-01 01:00"), pd.Timestamp("2023-01-01 02:00")]
+    assert edited.index.name == "Kod stacji"
+    np.testing.assert_array_equal(edited.to_numpy(), [[12.5, 3.0], [np.nan, 7.25]])
+
+
+# TEST 11
+import openpyxl
+from data_loader import read_gios_sheet
+
+def test_read_gios_sheet(tmp_path):
+    """Testuje strumieniowe wczytywanie arkusza read_gios_sheet().
+
+    Test zapisuje arkusz GIOŚ do pliku .xlsx i sprawdza, czy wynik jest zgodny
+    z wczytaniem przez pd.read_excel() i oczyszczeniem przez edit_df().
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Nr", 1, 2])
+    ws.append(["Kod stacji", "A1", "B1"])
+    ws.append(["Jednostka", "ug/m3", "ug/m3"])
+    for hour in range(1, 25):
+        ws.append([pd.Timestamp("2023-01-01") + pd.Timedelta(hours=hour), hour * 1.5, None if hour == 3 else "2,5"])
+    path = tmp_path / "sheet.xlsx"
+    wb.save(path)
+
+    streamed = read_gios_sheet(path)
+    expected = edit_df({2023: pd.read_excel(path, header=None)})[2023]
+
+    assert streamed.shape == (24, 2)
+    assert list(streamed.columns) == ["A1", "B1"]
+    assert streamed.index.equals(expected.index)
+    np.testing.assert_array_equal(streamed.to_numpy(), expected.to_numpy())
+    assert read_gios_sheet(path, dtype="float32").dtypes.eq(np.float32).all()
+
+
+# TEST 12
+import io
+import zipfile
+from data_loader import download_gios_archive
+
+def make_zip_archive(sheets):
+    """Tworzy archiwum ZIP z arkuszami {nazwa pliku: wartość} - każdy z jedną stacją A1 i jednym pomiarem."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        for name, value in sheets.items():
+            wb = openpyxl.Workbook()
+            wb.active.append(["Kod stacji", "A1"])
+            wb.active.append([pd.Timestamp("2023-01-01 01:00"), value])
+            sheet = io.BytesIO()
+            wb.save(sheet)
+            z.writestr(name, sheet.getvalue())
+    return archive.getvalue()
+
+
+def test_download_gios_archive_streaming(monkeypatch):
+    """Testuje download_gios_archive() bez cache.
+
+    Archiwum ZIP z dwoma arkuszami jest pobierane strumieniowo (porcjami przez iter_content).
+    Sprawdza, czy wczytywany jest tylko wskazany plik, zarówno jako surowy arkusz, jak i oczyszczona ramka.
+    """
+    archive = make_zip_archive({"a.xlsx": 1.0, "b.xlsx": 2.0})
+    requested = []
+
+    def fake_get(url, stream=False, **kwargs):
+        requested.append((url, stream))
+        return FakeResponse(archive)
+
+    monkeypatch.setattr(data_loader.requests, "get", fake_get)
+
+    raw = download_gios_archive(2023, "7", "b.xlsx", "http://x/")
+    clean = download_gios_archive(2023, "7", "b.xlsx", "http://x/", clean=True)
+
+    assert requested == [("http://x/7", True)] * 2
+    assert raw.iloc[1, 1] == 2.0
+    assert clean.loc["2023-01-01 01:00", "A1"] == 2.0
+
+
+# TEST 13
+from data_loader import download_multiple_gios_members
+
+def test_download_multiple_gios_members(monkeypatch, tmp_path):
+    """Testuje download_multiple_gios_members().
+
+    Każde archiwum powinno zostać pobrane tylko raz, niezależnie od liczby wczytywanych arkuszy,
+    a brakujący arkusz powinien zostać zgłoszony w GiosDownloadError bez utraty pozostałych.
+    """
+    archives = {
+        "http://x/1": make_zip_archive({"2015_PM25_1g.xlsx": 1.0, "2015_NO2_1g.xlsx": 2.0}),
+        "http://x/2": make_zip_archive({"2018_PM25_1g.xlsx": 3.0, "2018_NO2_1g.xlsx": 4.0}),
+    }
+    requested = []
+
+    def fake_get(url, **kwargs):
+        requested.append(url)
+        return FakeResponse(archives[url])
+
+    monkeypatch.setattr(data_loader.requests, "get", fake_get)
+    members = {("PM25", "1g"): "{year}_PM25_1g.xlsx", ("NO2", "1g"): "{year}_NO2_1g.xlsx"}
+
+    data = download_multiple_gios_members([2015, 2018], {2015: "1", 2018: "2"}, members, "http://x/",
+                                          cache=GiosCache(tmp_path))
+
+    assert sorted(requested) == ["http://x/1", "http://x/2"]
+    assert list(data) == [(2015, "PM25", "1g"), (2015, "NO2", "1g"), (2018, "PM25", "1g"), (2018, "NO2", "1g")]
+    assert data[(2018, "NO2", "1g")].iloc[0, 0] == 4.0
+
+    members[("O3", "1g")] = "{year}_O3_1g.xlsx"
+    with pytest.raises(GiosDownloadError) as exc:
+        download_multiple_gios_members([2015], {2015: "1"}, members, "http://x/")
+    assert set(exc.value.errors) == {(2015, "O3", "1g")}
+    assert len(exc.value.data) == 2
+
+
+# TEST 14
+from data_loader import compact_frame
+from average_and_limits import voivodeship_exceedances
+
+def test_compact_frame():
+    """Testuje tryb kompaktowy compact_frame().
+
+    Sprawdza, czy ramka float32 zajmuje o połowę mniej pamięci, a funkcje z average_and_limits
+    dają na niej wyniki w granicach tolerancji opisanej w module.
+    """
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2023-01-01", "2024-12-31 23:00", freq="h")
+    cols = pd.MultiIndex.from_product([["X", "Y"], ["1", "2"]], names=["Miejscowość", "Kod stacji"])
+    values = rng.gamma(2.0, 10.0, size=(len(idx), 4)).round(1)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    df = pd.DataFrame(values, index=idx, columns=cols)
+
+    compact = compact_frame(df)
+
+    assert (compact.dtypes == np.float32).all()
+    assert compact.memory_usage(index=False).sum() * 2 == df.memory_usage(index=False).sum()
+    assert compact.isna().equals(df.isna())
+    np.testing.assert_allclose(monthly_mean(compact), monthly_mean(df), rtol=1e-6)
+    pd.testing.assert_frame_equal(find_above_norm(compact, [2023, 2024], 2024),
+                                  find_above_norm(df, [2023, 2024], 2024))
+    voiv_map = pd.Series({"1": "A", "2": "B"})
+    pd.testing.assert_frame_equal(voivodeship_exceedances(compact, voiv_map, [2023, 2024]),
+                                  voivodeship_exceedances(df, voiv_map, [2023, 2024]))
+
+
+# TEST 15
+from data_loader import read_combined_data, iter_combined_data
+
+@pytest.mark.parametrize("name", ["combined.csv", "combined.csv.gz", "combined.feather", "combined.parquet"])
+def test_read_combined_data(tmp_path, name):
+    """Testuje zapis save_combined_data() i odczyt read_combined_data() w różnych formatach.
+
+    Sprawdza, czy odtworzone są dokładnie wartości, MultiIndex kolumn i DatetimeIndex,
+    oraz czy można wczytać tylko wybrany rok i wybrane stacje.
+    """
+    if name.endswith((".feather", ".parquet")):
+        pytest.importorskip("pyarrow")
+    cols = pd.MultiIndex.from_tuples([("X", "A1"), ("X", "A2"), ("Y", "B1")], names=["Miejscowość", "Kod stacji"])
+    df_dict = {}
+    for year in (2023, 2024):
+        idx = pd.date_range(f"{year}-01-01 00:59:59", periods=30, freq="h", name="Kod stacji")
+        df_dict[year] = pd.DataFrame(np.random.default_rng(year).random((30, 3)), index=idx, columns=cols)
+
+    combined = save_combined_data(df_dict, tmp_path / name)
+
+    pd.testing.assert_frame_equal(read_combined_data(tmp_path / name), combined, check_freq=False, check_exact=True)
+    chunks = pd.concat(list(iter_combined_data(tmp_path / name, chunksize=7)))
+    pd.testing.assert_frame_equal(chunks, combined, check_freq=False, check_exact=True)
+    subset = read_combined_data(tmp_path / name, years=[2024], stations=["A2", "B1"])
+    pd.testing.assert_frame_equal(subset, df_dict[2024].iloc[:, 1:], check_freq=False)
+
+
+def test_combined_data_without_suffix(tmp_path):
+    """Testuje dane zapisane z jawnym formatem pod ścieżką bez rozszerzenia: odczyt, lata i dopisywanie
+    powinny korzystać z formatu zapisanego w pliku opisu."""
+    pytest.importorskip("pyarrow")
+    from data_loader import append_combined_data, stored_years
+
+    def year_frame(year):
+        idx = pd.date_range(f"{year}-01-01 00:59:59", periods=30, freq="h")
+        return pd.DataFrame(np.random.default_rng(year).random((30, 2)), index=idx, columns=["A1", "B1"])
+
+    path = tmp_path / "store"
+    save_combined_data({2023: year_frame(2023)}, path, format="parquet")
+    assert (path / "_meta.json").exists()
+    pd.testing.assert_frame_equal(read_combined_data(path), year_frame(2023), check_freq=False)
+    assert stored_years(path) == [2023]
+
+    combined = append_combined_data({2024: year_frame(2024)}, path)
+    assert stored_years(path) == [2023, 2024]
+    pd.testing.assert_frame_equal(read_combined_data(path), combined, check_freq=False)
+
+
+# TEST 16
+from data_loader import append_combined_data, stored_years
+
+@pytest.mark.parametrize("name", ["combined.csv", "combined.parquet"])
+@pytest.mark.parametrize("new_stations", [["A", "C"], ["D", "C", "B", "A"]])
+def test_append_combined_data(tmp_path, name, new_stations):
+    """Testuje przyrostowe dopisywanie lat append_combined_data() oraz ponowne użycie wyników monthly_mean().
+
+    Wynik po dopisaniu roku powinien być taki sam jak przy zapisie wszystkich lat naraz,
+    łącznie z ograniczeniem do stacji wspólnych dla wszystkich lat (join='inner').
+    """
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+
+    def year_frame(year, stations):
+        # jak w arkuszach GIOŚ: pierwsza godzina roku kończy się o 01:00, a 00:00 zamyka poprzedni rok
+        idx = pd.date_range(f"{year}-01-01 01:00", periods=24 * 40, freq="h", name="Kod stacji")
+        return pd.DataFrame(np.random.default_rng(year).random((len(idx), len(stations))), index=idx, columns=stations)
+
+    old = {2023: year_frame(2023, ["A", "B", "C"])}
+    new = {2024: year_frame(2024, new_stations)}
+    path = tmp_path / name
+
+    save_combined_data(old, path)
+    old_monthly = monthly_mean(read_combined_data(path))
+    assert stored_years(path) == [2023]
+
+    combined = append_combined_data(new, path)
+    expected = pd.concat([old[2023], new[2024]], join="inner")
+
+    assert stored_years(path) == [2023, 2024]
+    pd.testing.assert_frame_equal(combined, expected, check_freq=False)
+    pd.testing.assert_frame_equal(read_combined_data(path), expected, check_freq=False)
+    pd.testing.assert_frame_equal(monthly_mean(combined, previous=old_monthly), monthly_mean(expected))
+    with pytest.raises(ValueError):
+        append_combined_data(new, path)
+
+
+@pytest.mark.parametrize("name", ["combined.csv", "combined.parquet"])
+def test_stored_years_unshifted(tmp_path, name):
+    """Testuje lata zapisanych danych bez korekty correct_datetime_index().
+
+    Pomiar z 1 stycznia 00:00 zamyka poprzedni rok, więc dane jednego roku nie powinny
+    pojawiać się jako dwa lata, a dopisanie kolejnego roku nie powinno zgłaszać nakładania się lat.
+    """
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+
+    def year_frame(year):
+        idx = pd.date_range(f"{year}-01-01 01:00", f"{year + 1}-01-01 00:00", freq="h")
+        return pd.DataFrame(np.random.default_rng(year).random((len(idx), 2)), index=idx, columns=["A1", "B1"])
+
+    path = tmp_path / name
+    save_combined_data({2023: year_frame(2023)}, path)
+    assert stored_years(path) == [2023]
+
+    combined = append_combined_data({2024: year_frame(2024)}, path)
+    assert stored_years(path) == [2023, 2024]
+    pd.testing.assert_frame_equal(read_combined_data(path), combined, check_freq=False)
+    pd.testing.assert_frame_equal(read_combined_data(path, years=[2023]), year_frame(2023), check_freq=False)
+
+
+# TEST 17
+
+def test_find_above_norm_multiple_norms():
+    """Testuje find_above_norm() dla kilku norm naraz.
+
+    Wynik w postaci długiej tabeli powinien zawierać liczbę dni dla każdej normy, roku i stacji,
+    zgodną z wynikami dla pojedynczych norm.
+    """
+    idx = pd.date_range("2023-12-30", periods=96, freq="h")  # 2 dni w 2023 i 2 dni w 2024
+    df = pd.DataFrame({"S1": [20] * 48 + [30] * 48, "S2": [5] * 96}, index=idx)
+
+    result = find_above_norm(df, years=[2023, 2024], sort_by=2024, norm=[15, 25])
+
+    assert list(result.columns) == ["Kod stacji", "norma", "rok", "liczba_dni"]
+    counts = result.set_index(["norma", "rok", "Kod stacji"])["liczba_dni"]
+    assert counts[(15, 2023, "S1")] == 2
+    assert counts[(25, 2023, "S1")] == 0
+    assert counts[(25, 2024, "S1")] == 2
+    assert counts[(15, 2024, "S2")] == 0
+    for norm in (15, 25):
+        single = find_above_norm(df, years=[2023, 2024], sort_by=2024, norm=norm)
+        wide = counts[norm].unstack("rok").loc[single.index]
+        np.testing.assert_array_equal(wide.to_numpy(), single.to_numpy())
+
+
+# TEST 18
+from average_and_limits import group_mean
+
+def test_group_mean():
+    """Testuje uśrednianie stacji w grupach group_mean().
+
+    Sprawdza grupowanie według poziomu 'Miejscowość' oraz według własnego mapowania regionów,
+    z pominięciem braków danych i stacji spoza mapowania.
+    """
+    cols = pd.MultiIndex.from_tuples([("X", "A1"), ("X", "A2"), ("Y", "B1")], names=["Miejscowość", "Kod stacji"])
+    df = pd.DataFrame([[1.0, 3.0, 10.0], [np.nan, 4.0, np.nan]], columns=cols)
+
+    by_city = group_mean(df, "Miejscowość")
+    by_region = group_mean(df, {"A1": "R1", "B1": "R1"})
+
+    np.testing.assert_array_equal(by_city.to_numpy(), [[2.0, 10.0], [4.0, np.nan]])
+    assert list(by_city.columns) == ["X", "Y"]
+    np.testing.assert_array_equal(by_region.to_numpy(), [[5.5], [np.nan]])
+    assert list(by_region.columns) == ["R1"]
+
+
+# TEST 19
+from average_and_limits import AggregationCube
+
+def test_aggregation_cube():
+    """Testuje kostkę agregacji AggregationCube.
+
+    Wyniki liczone z zapamiętanych sum dobowych powinny być zgodne z monthly_mean(),
+    find_above_norm(), voivodeship_exceedances() oraz średnimi miast liczonymi przez group_mean().
+    """
+    rng = np.random.default_rng(1)
+    idx = pd.date_range("2023-01-01", "2024-12-31 23:00", freq="h")
+    cols = pd.MultiIndex.from_tuples([("X", "A1"), ("X", "A2"), ("Y", "B1")], names=["Miejscowość", "Kod stacji"])
+    values = rng.gamma(2.0, 10.0, size=(len(idx), 3))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    df = pd.DataFrame(values, index=idx, columns=cols)
+    voiv_map = pd.Series({"A1": "V1", "A2": "V2", "B1": "V2"})
+
+    cube = AggregationCube(df, voiv_map)
+
+    pd.testing.assert_frame_equal(cube.monthly_mean(), monthly_mean(df))
+    pd.testing.assert_frame_equal(cube.mean("M", "city"), group_mean(monthly_mean(df), "Miejscowość"))
+    pd.testing.assert_frame_equal(cube.exceedances([2023, 2024], sort_by=2024),
+                                  find_above_norm(df, [2023, 2024], 2024))
+    pd.testing.assert_frame_equal(cube.exceedances([2023, 2024], by="voivodeship"),
+                                  voivodeship_exceedances(df, voiv_map, [2023, 2024]))
+    assert cube.mean("M", "city") is cube.mean("M", "city")  # wynik zapamiętany
+    np.testing.assert_allclose(cube.mean("Y").to_numpy(), df.groupby(df.index.year).mean().to_numpy())
+
+    # dwa różne mapowania na regiony, jedno po drugim (pierwsze usuwane z pamięci)
+    regions = cube.mean("M", {"A1": "R1", "A2": "R1", "B1": "R2"})
+    assert list(regions.columns) == ["R1", "R2"]
+    other = cube.mean("M", {"A1": "Q", "A2": "Q", "B1": "Q"})
+    assert list(other.columns) == ["Q"]
+    assert list(cube.exceedances([2023], by={"A1": "Z", "A2": "Z", "B1": "Z"}).index) == ["Z"]
+
+
+# TEST 20
+from data_loader import iter_combined_data
+
+@pytest.mark.parametrize("name", ["combined.csv", "combined.feather", "combined.parquet"])
+def test_aggregation_cube_from_chunks(tmp_path, name):
+    """Testuje agregację fragmentami: iter_combined_data() + AggregationCube.from_chunks().
+
+    Fragmenty CSV (po 7 wierszy) dzielą dni między fragmenty. Wyniki powinny być takie same
+    jak dla kostki zbudowanej z całych danych.
+    """
+    if name.endswith((".feather", ".parquet")):
+        pytest.importorskip("pyarrow")
+    cols = pd.MultiIndex.from_tuples([("X", "A1"), ("Y", "B1")], names=["Miejscowość", "Kod stacji"])
+    df_dict = {}
+    for year in (2023, 2024):
+        idx = pd.date_range(f"{year}-01-01", periods=24 * 60, freq="h", name="Kod stacji")
+        df_dict[year] = pd.DataFrame(np.random.default_rng(year).gamma(2.0, 10.0, (len(idx), 2)), index=idx,
+                                     columns=cols)
+    df_all = save_combined_data(df_dict, tmp_path / name)
+    voiv_map = {"A1": "V1", "B1": "V2"}
+
+    chunks = list(iter_combined_data(tmp_path / name, chunksize=7))
+    cube = AggregationCube.from_chunks(chunks, voiv_map)
+    full = AggregationCube(df_all, voiv_map)
+
+    assert sum(len(chunk) for chunk in chunks) == len(df_all)
+    pd.testing.assert_frame_equal(cube.monthly_mean(), full.monthly_mean())
+    pd.testing.assert_frame_equal(cube.exceedances([2023, 2024], by="voivodeship"),
+                                  voivodeship_exceedances(df_all, voiv_map, [2023, 2024]))
+    pd.testing.assert_frame_equal(cube.exceedances([2023, 2024], sort_by=2024),
+                                  find_above_norm(df_all, [2023, 2024], 2024))
+
+
+# TEST 21
+from data_loader import create_code_map, correct_datetime_index, process_years_parallel
+
+def test_process_years_parallel():
+    """Testuje równoległe przetwarzanie lat process_years_parallel().
+
+    Wynik powinien być identyczny z sekwencyjnym ciągiem edit_df() -> create_code_map() ->
+    multiindex_code_city() -> correct_datetime_index(), łącznie z mapowaniem starego kodu stacji.
+    """
+    metadata = pd.DataFrame({
+        "Stary Kod stacji \n(o ile inny od aktualnego)": ["OLD1, OLD2", None],
+        "Kod stacji": ["A1", "B1"],
+        "Miejscowość": ["X", "Y"],
+    })
+    sources = {}
+    for year, old_code in [(2023, "OLD1"), (2024, "A1")]:
+        dates = pd.date_range(f"{year}-01-01 01:00", periods=48, freq="h")
+        raw = pd.DataFrame({0: list(dates), 1: np.arange(48) / 2, 2: np.ones(48)})
+        sources[year] = pd.concat([pd.DataFrame([["Kod stacji", old_code, "B1"]]), raw], ignore_index=True)
+
+    serial = correct_datetime_index(multiindex_code_city(create_code_map(metadata, edit_df(sources)), metadata))
+    parallel = process_years_parallel(sources, metadata, max_workers=2)
+
+    assert list(parallel) == [2023, 2024]
+    for year in sources:
+        pd.testing.assert_frame_equal(parallel[year], serial[year])
+    assert list(parallel[2023].columns) == [("X", "A1"), ("Y", "B1")]
+
+
+# TEST 22
+from data_loader import Pipeline
+
+def test_pipeline():
+    """Testuje leniwy potok Pipeline.
+
+    Wyniki powinny być identyczne z ręcznym ciągiem edit_df() -> create_code_map() ->
+    multiindex_code_city() -> correct_datetime_index() -> monthly_mean(), a źródła
+    powinny być wczytywane dopiero przy wykonaniu potoku.
+    """
+    metadata = pd.DataFrame({
+        "Stary Kod stacji \n(o ile inny od aktualnego)": ["OLD1", None, None],
+        "Kod stacji": ["A1", "B1", "C1"],
+        "Miejscowość": ["X", "Y", "Y"],
+    })
+    calls = []
+
+    def loader(year, old_code):
+        def load():
+            calls.append(year)
+            dates = pd.date_range(f"{year}-01-01 00:00", periods=72, freq="h")
+            raw = pd.DataFrame({0: list(dates), 1: np.arange(72) / 2, 2: np.ones(72), 3: np.full(72, 3.0)})
+            return pd.concat([pd.DataFrame([["Kod stacji", old_code, "B1", "C1"]]), raw], ignore_index=True)
+        return load
+
+    sources = {2023: loader(2023, "OLD1"), 2024: loader(2024, "A1")}
+    pipeline = Pipeline(sources).map_codes(metadata).add_cities(metadata).correct_datetime()
+    assert calls == []
+
+    eager = correct_datetime_index(multiindex_code_city(
+        create_code_map(metadata, edit_df({year: load() for year, load in sources.items()})), metadata))
+    df_all = pd.concat(eager.values(), join='inner')
+
+    collected = pipeline.collect()
+    for year in sources:
+        pd.testing.assert_frame_equal(collected[year], eager[year])
+    pd.testing.assert_frame_equal(pipeline.combine(), df_all)
+    pd.testing.assert_frame_equal(pipeline.monthly_mean(), monthly_mean(df_all))
+
+    selected = pipeline.select(cities=["Y"]).monthly_mean(by="Miejscowość")
+    expected = monthly_mean(df_all).T.groupby(level="Miejscowość").mean().T[["Y"]]
+    pd.testing.assert_frame_equal(selected, expected, check_names=False)
+
+    with pytest.raises(ValueError):
+        Pipeline(sources).select(cities=["Y"]).collect()
+
+
+# TEST 23
+from data_loader import StationIndex, station_index, station_registry, prepare_station_voiv_map, GiosCache
+
+def test_station_index(tmp_path):
+    """Testuje indeks stacji StationIndex.
+
+    Łańcuchy zmian kodów (A→B, B→C) powinny być rozwiązywane jednym wyszukaniem, indeks
+    powinien być budowany raz na proces i zapisywany/wczytywany z katalogu cache, a rejestr
+    atrybutów stacji powinien korzystać z tego samego indeksu.
+    """
+    metadata = pd.DataFrame({
+        "Stary Kod stacji \n(o ile inny od aktualnego)": ["A", "B, D", None],
+        "Kod stacji": ["B", "C", "E"],
+        "Miejscowość": ["X", "X", "Y"],
+        "Województwo": ["W1", "W1", "W2"],
+    })
+    index = StationIndex.from_metadata(metadata)
+    assert index.aliases == {"A": "C", "B": "C", "D": "C"}
+    assert list(index.resolve(["A", "D", "E", "Z"])) == ["C", "C", "E", "Z"]
+
+    df_dict = {2020: pd.DataFrame({"A": [1.0], "E": [2.0]}), 2024: pd.DataFrame({"C": [3.0], "E": [4.0]})}
+    df_dict = create_code_map(metadata, df_dict)
+    assert list(df_dict[2020].columns) == ["C", "E"]
+    assert station_index(metadata) is station_index(metadata.copy())
+
+    cache = GiosCache(tmp_path / "cache")
+    index.save(tmp_path / "stations.json")
+    loaded = StationIndex.load(tmp_path / "stations.json")
+    assert loaded.aliases == index.aliases
+    assert loaded.fingerprint == index.fingerprint
+
+    data_loader._station_indexes.clear()
+    station_index(metadata, cache=cache)
+    data_loader._station_indexes.clear()
+    assert (tmp_path / "cache" / "stations" / f"{index.fingerprint}.json").exists()
+    assert station_index(metadata, cache=cache).aliases == index.aliases
+    assert list(prepare_station_voiv_map(metadata).items()) == [("B", "W1"), ("C", "W1"), ("E", "W2")]
+    assert station_registry(metadata).index is station_index(metadata)
+
+
+# TEST 24
+from data_loader import StationRegistry, station_registry
+
+def test_station_registry():
+    """Testuje rejestr atrybutów stacji StationRegistry.
+
+    Wyszukiwanie dla tablic kodów (również dawnych) powinno zwracać atrybuty w kolejności kodów,
+    a MultiIndex kolumn powinien być zapamiętany dla zestawu kodów.
+    """
+    metadata = pd.DataFrame({
+        "Stary Kod stacji \n(o ile inny od aktualnego)": ["OLD1", None],
+        "Kod stacji": ["A1", "B1"],
+        "Miejscowość": ["X", "Y"],
+        "Województwo": ["W1", "W2"],
+        "WGS84 φ N": [50.1, 52.2],
+        "WGS84 λ E": [19.9, 21.0],
+        "Data uruchomienia": ["2001-01-01", "2010-05-01"],
+        "Data zamknięcia": [None, "2020-12-31"],
+    })
+    registry = station_registry(metadata)
+    assert registry is station_registry(metadata.copy())
+
+    assert list(registry.city(["B1", "OLD1", "ZZZ"])[:2]) == ["Y", "X"]
+    assert pd.isna(registry.city(["ZZZ"])[0])
+    assert list(registry.voivodeship(np.array(["A1", "B1"]))) == ["W1", "W2"]
+    np.testing.assert_allclose(registry.coordinates(["B1", "A1"]), [[52.2, 21.0], [50.1, 19.9]])
+    dates = registry.active_dates(["A1", "B1"])
+    assert dates.loc["B1", "Data zamknięcia"] == pd.Timestamp("2020-12-31")
+    assert pd.isna(dates.loc["A1", "Data zamknięcia"])
+
+    columns = pd.Index(["B1", "A1"])
+    assert registry.multiindex(columns) is registry.multiindex(pd.Index(["B1", "A1"]))
+    assert list(registry.multiindex(columns)) == [("Y", "B1"), ("X", "A1")]
+    with pytest.raises(KeyError):
+        StationRegistry(metadata).multiindex(["ZZZ"])
+
+
+# TEST 25
+from average_and_limits import measurement_days, daily_mean
+
+@pytest.mark.parametrize("unit", ["ns", "us", "s"])
+def test_correct_datetime_index_day_keys(unit):
+    """Testuje correct_datetime_index() na buforze int64 oraz klucze dni pomiaru.
+
+    Północ powinna zostać przesunięta o sekundę wstecz niezależnie od rozdzielczości indeksu,
+    a klucze dni pomiaru powinny przypisywać godzinę 23:59:59 do dnia, który zamyka.
+    """
+    index = pd.date_range("2024-01-01 00:00", periods=72, freq="h").as_unit(unit)
+    df = pd.DataFrame({"A1": np.arange(72.0)}, index=index)
+    expected = index - pd.to_timedelta((index.hour == 0).astype(int), unit="s")
+
+    out = correct_datetime_index({2024: df})[2024]
+    assert list(out.index) == list(expected)
+
+    days = measurement_days(out.index)
+    assert list(np.unique(days)) == [19722, 19723, 19724, 19725]  # 31.12.2023 - 03.01.2024
+    daily = daily_mean(out)
+    assert daily.index[0] == pd.Timestamp("2023-12-31")
+    assert daily.loc["2024-01-01", "A1"] == np.arange(1, 25).mean()
+
+
+# TEST 26
+from data_loader import completeness_report
+
+def test_completeness_report(tmp_path, capsys):
+    """Testuje raport kompletności danych completeness_report().
+
+    Raport powinien wskazać brakujące dni i godziny w latach oraz brakujące pomiary stacji,
+    a save_combined_data() powinna sprawdzać dane tylko na życzenie (validate=True).
+    """
+    dates = pd.date_range("2023-01-01 01:00", "2025-01-01 00:00", freq="h")
+    df = pd.DataFrame({"A1": np.ones(len(dates)), "B1": np.ones(len(dates))}, index=dates)
+    df = correct_datetime_index({0: df})[0]
+    df = df.drop(df.loc["2024-03-01"].index[:5])  # 5 godzin mniej w 2024
+    df = df.drop(df.loc["2023-06-10"].index)  # cały dzień mniej w 2023
+    df.loc["2024-07-01", "B1"] = np.nan  # 24 godziny bez pomiaru stacji B1
+
+    report = completeness_report(df)
+    years = report["years"]
+    assert list(years.index) == [2023, 2024]
+    assert list(years["dni"]) == [364, 366]
+    assert list(years["brakujące_dni"]) == [1, 0]
+    assert list(years["brakujące_godziny"]) == [24, 5]
+    assert report["stations"].loc["A1"].tolist() == [24, 5]
+    assert report["stations"].loc["B1"].tolist() == [24, 29]
+
+    save_combined_data({2023: df}, tmp_path / "dane.csv")
+    assert capsys.readouterr().out == ""
+    save_combined_data({2023: df}, tmp_path / "dane.csv", validate=True)
+    assert "2024" in capsys.readouterr().out
+
+
+# TEST 27
+from visualizations import heatmaps, render_city_heatmaps
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_render_city_heatmaps(tmp_path, max_workers):
+    """Testuje wsadowe rysowanie heatmap render_city_heatmaps() i zapis wykresów bez plt.show().
+
+    Dla każdego miasta powinien powstać osobny plik, a heatmaps() z path powinna zapisać
+    i zwrócić figurę.
+    """
+    index = pd.MultiIndex.from_product([[2023, 2024], range(1, 13)], names=["rok", "miesiąc"])
+    df = pd.DataFrame({city: np.arange(24.0) + k for k, city in enumerate(["A", "B", "C"])}, index=index)
+
+    paths = render_city_heatmaps(df, tmp_path / "raport", format="svg", max_workers=max_workers)
+    assert list(paths) == ["A", "B", "C"]
+    assert all(path.exists() and path.suffix == ".svg" for path in paths.values())
+
+    fig = heatmaps(df, show=False, path=tmp_path / "wszystkie.png")
+    assert (tmp_path / "wszystkie.png").exists()
+    assert len(fig.axes) >= 3
+
+
+def test_headless_rendering_keeps_caller_state(tmp_path):
+    """Testuje, że rysowanie wsadowe nie zmienia backendu wywołującego i nie zostawia otwartych figur."""
+    import matplotlib.pyplot as plt
+
+    index = pd.MultiIndex.from_product([[2023, 2024], range(1, 13)], names=["rok", "miesiąc"])
+    df = pd.DataFrame({city: np.arange(24.0) + k for k, city in enumerate(["A", "B"])}, index=index)
+
+    plt.close("all")
+    backend = matplotlib.get_backend()
+    matplotlib.use("svg")
+    try:
+        render_city_heatmaps(df, tmp_path / "raport", max_workers=1)
+        assert matplotlib.get_backend() == "svg"
+    finally:
+        matplotlib.use(backend)
+
+    for k in range(5):
+        heatmaps(df, show=False, path=tmp_path / f"wykres{k}.png")
+    assert plt.get_fignums() == []
+
+
+# TEST 28
+from visualizations import monthly_grid, small_multiples
+
+def test_monthly_grid():
+    """Testuje tablicę miasto x rok x miesiąc monthly_grid() i wykres small_multiples().
+
+    Wartości powinny odpowiadać pivot dla każdego miasta, brakujące miesiące powinny być NaN,
+    a tablice miast powinny być widokami (bez kopiowania).
+    """
+    index = pd.MultiIndex.from_product([[2023, 2024], range(1, 13)], names=["rok", "miesiąc"])
+    df = pd.DataFrame({"A": np.arange(24.0), "B": np.arange(24.0) * 2}, index=index).drop((2024, 5))
+
+    grid, cities, years = monthly_grid(df)
+    assert grid.shape == (2, 2, 12)
+    assert cities == ["A", "B"] and years == [2023, 2024]
+    assert grid[1, 0, 2] == 4.0  # B, 2023, marzec
+    assert np.isnan(grid[0, 1, 4])  # A, 2024, maj
+    assert not grid.flags.owndata and not grid[0].flags.owndata
+
+    fig = small_multiples(df, show=False)
+    assert len(fig.axes) == 3  # dwa panele i pasek kolorów
+
+
+# TEST 29
+from visualizations import decimate_minmax, plot_timeseries
+
+def test_plot_timeseries():
+    """Testuje decymację min/max decimate_minmax() i wykres plot_timeseries().
+
+    Decymacja powinna zachować minimum i maksimum serii oraz ograniczyć liczbę punktów,
+    a wykres z wielu lat danych godzinowych powinien mieć co najwyżej 2 punkty na piksel.
+    """
+    x = np.arange(10_000)
+    y = np.sin(x / 100.0)
+    y[1234] = 50.0
+    y[5000:6000] = np.nan
+    x_dec, y_dec = decimate_minmax(x, y, 100)
+    assert len(y_dec) <= 200
+    assert 50.0 in y_dec and y_dec.min() == np.nanmin(y)
+    assert np.all(np.diff(x_dec) > 0) and not np.isnan(y_dec).any()
+
+    dates = pd.date_range("2022-01-01 01:00", "2024-12-31 23:00", freq="h")
+    columns = pd.MultiIndex.from_tuples([("X", "A1"), ("Y", "B1")], names=["Miejscowość", "Kod stacji"])
+    df = pd.DataFrame(np.random.default_rng(0).gamma(2.0, 10.0, (len(dates), 2)), index=dates, columns=columns)
+
+    fig = plot_timeseries(df, ["A1"], level="hourly", show=False)
+    line = fig.axes[0].lines[0]
+    assert len(line.get_xdata()) <= 2 * fig.axes[0].get_window_extent().width
+    assert line.get_ydata().max() == df[("X", "A1")].max()
+
+    assert "miesięczne" in plot_timeseries(df, ["A1", "B1"], show=False).axes[0].get_title()
+    assert "dobowe" in plot_timeseries(df, ["A1"], start="2024-01-01", show=False).axes[0].get_title()
+    assert "godzinowe" in plot_timeseries(df, ["B1"], start="2024-12-01", show=False).axes[0].get_title()
+
+
+# TEST 30
+import os
+import subprocess
+import sys
+
+def test_lazy_imports():
+    """Testuje leniwe importy: sam import modułów projektu nie wczytuje requests, openpyxl,
+    matplotlib ani seaborn (biblioteki te są wczytywane dopiero przy pobieraniu lub rysowaniu).
+    """
+    script = ("import sys, data_loader, average_and_limits, visualizations; "
+              "print(' '.join(m for m in ['requests', 'openpyxl', 'matplotlib', 'seaborn'] if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert out.stdout.strip() == ""
+    assert data_loader.requests.get is not None  # dostęp do modułu z zewnątrz nadal działa
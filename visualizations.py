@@ -1,7 +1,10 @@
+import os
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
+
+from average_and_limits import daily_mean
 """
 visualizations.py
 --------------
@@ -9,8 +12,34 @@ Moduł służący do wizualizacji danych o stężeniu pyłów PM2.5.
 Zawiera funkcje do generowania wykresów liniowych, map ciepła (heatmaps) 
 oraz zestawień słupkowych dla wybranych stacji pomiarowych.
 
+Wszystkie funkcje rysujące zwracają obiekt `Figure`. Parametr `show=False` wyłącza `plt.show()`,
+a `path` zapisuje wykres do pliku (format według rozszerzenia, np. .png, .svg) - tryb wsadowy, np. na serwerze.
+Przy `show=False` i podanym `path` figura jest po zapisie zamykana w pyplot (nie zajmuje pamięci w pętli);
+przy `show=False` bez `path` zwracana figura pozostaje otwarta i to wywołujący odpowiada za jej zamknięcie
+(`plt.close(fig)`).
+`render_city_heatmaps` zapisuje osobne heatmapy dla wielu miast równolegle w puli procesów (backend Agg).
+Heatmapy i `small_multiples` rysowane są z tablicy miasto x rok x miesiąc (`monthly_grid`).
+`plot_timeseries` rysuje dane godzinowe, ograniczając liczbę punktów do szerokości wykresu w pikselach.
+
+Biblioteki matplotlib i seaborn importowane są dopiero wewnątrz funkcji rysujących, więc import modułu
+(np. w procesach liczących agregaty) nie wczytuje bibliotek graficznych.
+
 """
-def plot_average(monthly_df_grouped, years, cities):
+
+
+def _finish(fig, show, path):
+    # zapis i/lub wyświetlenie gotowego wykresu; wykres tylko zapisywany jest zamykany w pyplot
+    import matplotlib.pyplot as plt
+
+    if path is not None:
+        fig.savefig(path)
+    if show:
+        plt.show()
+    elif path is not None:
+        plt.close(fig)  # bez wycieku figur przy zapisie wsadowym
+    return fig
+
+def plot_average(monthly_df_grouped, years, cities, show=True, path=None):
     """
         Funkcja rysująca wykres liniowy pokazujący trend średnich miesięcznych wartości PM2.5 dla wybranych lat i miast  
 
@@ -18,42 +47,83 @@ def plot_average(monthly_df_grouped, years, cities):
         monthly_df_grouped (pd.DataFrame): Zgrupowana po miastach ramka danych z uśrednionymi miesięcznymi wartościami PM2.5 
         years (list[int]): lista lat które będą analizowane  
         cities(list[str]): lista analizowanych miast 
+        show (bool, optional): Czy wyświetlić wykres (`plt.show`). Domyślnie True.
+        path (str | Path, optional): Plik, do którego zapisać wykres (.png, .svg). Domyślnie None.
    
     Returns:
-        None
+        Figure: Wykres.
     """
+    import matplotlib.pyplot as plt
+
     # średnie dla stacji
     colors = plt.cm.Set2.colors
     color_index = 0
 
     df = monthly_df_grouped[cities]
+    fig, ax = plt.subplots()
     
     for year in years:
         df_year = df.loc[year]
         for city in cities:
-            plt.plot(range(1,13), df_year[city], label=f'{city} {year}', marker='o', color=colors[color_index])
+            ax.plot(range(1,13), df_year[city], label=f'{city} {year}', marker='o', color=colors[color_index])
             color_index += 1
 
-    plt.xlabel('Miesiąc')
-    plt.xticks(range(1,13))
-    plt.ylabel('Średni poziom PM2.5')
-    plt.title(f'Średni miesięczny poziom PM2.5 w miastach: {", ".join(cities)} w latach: {", ".join(map(str, years))}')
-    plt.legend()
-    plt.show()
-    return 
+    ax.set_xlabel('Miesiąc')
+    ax.set_xticks(range(1,13))
+    ax.set_ylabel('Średni poziom PM2.5')
+    ax.set_title(f'Średni miesięczny poziom PM2.5 w miastach: {", ".join(cities)} w latach: {", ".join(map(str, years))}')
+    ax.legend()
+    return _finish(fig, show, path)
 
-def heatmaps(monthly_df_grouped):
+def monthly_grid(monthly_df_grouped, cities=None):
+    """
+    Funkcja przekształca ramkę średnich miesięcznych zgrupowaną po miastach w tablicę 3-D
+    (miasto x rok x miesiąc) jedną operacją, bez osobnego `pivot` dla każdego miasta.
+
+    Brakujące miesiące uzupełniane są wartością NaN. Tablica dla miasta `values[i]` jest widokiem
+    (bez kopiowania) i może być bezpośrednio rysowana jako heatmapa.
+
+    Args:
+        monthly_df_grouped (pd.DataFrame): Ramka z MultiIndexem ['rok', 'miesiąc'] i miastami w kolumnach.
+        cities (list[str], optional): Miasta do uwzględnienia. Domyślnie wszystkie kolumny.
+
+    Returns:
+        tuple[np.ndarray, list, list[int]]: Tablica (miasta x lata x 12), lista miast i lista lat.
+    """
+    if cities is None:
+        cities = [c for c in monthly_df_grouped.columns if c not in ['miesiąc', 'rok']]
+    years = sorted(monthly_df_grouped.index.get_level_values(0).unique())
+    full_index = pd.MultiIndex.from_product([years, range(1, 13)], names=['rok', 'miesiąc'])
+    values = monthly_df_grouped[cities].reindex(full_index).to_numpy(dtype="float64")
+    # (lata * 12) x miasta -> miasta x lata x miesiące (transpozycja jest widokiem)
+    return values.reshape(len(years), 12, len(cities)).transpose(2, 0, 1), list(cities), years
+
+
+def _draw_heatmap(ax, grid, years, city, cbar_ax=None):
+    import seaborn as sns
+
+    sns.heatmap(grid, cmap='YlOrRd', ax=ax, cbar_ax=cbar_ax, xticklabels=range(1, 13), yticklabels=years)
+    ax.set_title(f'{city} - średnie miesięczne PM2.5')
+    ax.set_xlabel('Miesiąc')
+    ax.set_ylabel('Rok')
+
+
+def heatmaps(monthly_df_grouped, show=True, path=None):
     """
         Funkcja rysująca heatmapy średnich miesięcznych wartości PM2.5 dla wszystkich miast
     
     Args:
         monthly_df_grouped (DataFrame): Zgrupowana po misatach ramka danych z uśrednionymi wartościami PM2.5 po wszytkich stacjach z danego miasta 
+        show (bool, optional): Czy wyświetlić wykres (`plt.show`). Domyślnie True.
+        path (str | Path, optional): Plik, do którego zapisać wykres (.png, .svg). Domyślnie None.
     
     Returns:
-        None
+        Figure: Wykres z heatmapami wszystkich miast.
     """
-    # lista miast
-    cities = [c for c in monthly_df_grouped.columns if c not in ['miesiąc', 'rok']]
+    import matplotlib.pyplot as plt
+
+    # tablica miasto x rok x miesiąc dla wszystkich miast naraz
+    grid, cities, years = monthly_grid(monthly_df_grouped)
     n = len(cities)
 
     # siatka podwykresów
@@ -63,32 +133,134 @@ def heatmaps(monthly_df_grouped):
     fig, axes = plt.subplots(rows, cols, figsize=(6 * cols, 6 * rows))
     axes = axes.flatten()
 
-    for ax, city in zip(axes, cities):
-        
-        # średnie wartości miesięczne dla miasta 
-        city_data = monthly_df_grouped[city]
-        city_data = city_data.reset_index()
-        city_data.columns = ['rok', 'miesiąc', 'PM2.5']
-        city_data['PM2.5'] = pd.to_numeric(city_data['PM2.5'])
-
-        df_pivot = city_data.pivot(index='rok', columns='miesiąc', values='PM2.5')
-
-        sns.heatmap(df_pivot, cmap='YlOrRd', ax=ax)
-        ax.set_title(f'{city} - średnie miesięczne PM2.5')
-        ax.set_xlabel('Miesiąc')
-        ax.set_ylabel('Rok')
+    for ax, city, city_grid in zip(axes, cities, grid):
+        _draw_heatmap(ax, city_grid, years, city)
 
     # Jeśli zostały puste osie, wyłączamy je
     for ax in axes[n:]:
         ax.axis("off")
 
-    plt.tight_layout()
-    plt.show()
-    return
+    fig.tight_layout()
+    return _finish(fig, show, path)
+
+
+_worker_template = None  # szablon wykresu (figura, osie, osie paska kolorów) w procesie roboczym
+
+
+def _heatmap_template(figsize):
+    # figura spoza pyplot (zapis bez zmiany backendu): figura, osie i osie paska kolorów
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    ax = fig.add_axes([0.1, 0.1, 0.7, 0.8])
+    cbar_ax = fig.add_axes([0.85, 0.1, 0.03, 0.8])
+    return fig, ax, cbar_ax
+
+
+def _init_heatmap_worker(figsize):
+    # każdy proces roboczy puli rysuje bez okien (Agg) na jednym, ponownie używanym szablonie wykresu
+    global _worker_template
+    import matplotlib
+
+    matplotlib.use("Agg")  # tylko w procesie roboczym - backend wywołującego pozostaje bez zmian
+    _worker_template = _heatmap_template(figsize)
+
+
+def _render_heatmap(task, template=None):
+    city, city_grid, years, path = task
+    fig, ax, cbar_ax = template or _worker_template
+    ax.clear()
+    cbar_ax.clear()
+    _draw_heatmap(ax, city_grid, years, city, cbar_ax=cbar_ax)
+    fig.savefig(path)
+    return path
+
+
+def render_city_heatmaps(monthly_df_grouped, directory, format="png", max_workers=None, figsize=(6, 6)):
+    """
+    Funkcja zapisuje heatmapę średnich miesięcznych PM2.5 dla każdego miasta do osobnego pliku
+    (np. raport dla setek miast na serwerze), bez wyświetlania wykresów.
+
+    Miasta rysowane są równolegle w puli procesów z backendem Agg. Każdy proces tworzy jeden szablon
+    wykresu (figura, osie, pasek kolorów) i czyści go przed kolejnym miastem, zamiast tworzyć nowe figury.
+
+    Args:
+        monthly_df_grouped (DataFrame): Ramka średnich miesięcznych zgrupowana po miastach (jak w `heatmaps`).
+        directory (str | Path): Katalog docelowy (zostanie utworzony).
+        format (str, optional): Format plików, np. "png" lub "svg". Domyślnie "png".
+        max_workers (int, optional): Liczba procesów. Domyślnie None - liczba procesorów;
+            1 - rysowanie w bieżącym procesie (bez zmiany backendu matplotlib).
+        figsize (tuple, optional): Rozmiar wykresu w calach. Domyślnie (6, 6).
+
+    Returns:
+        dict: Słownik {miasto: ścieżka zapisanego pliku}.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    grid, cities, years = monthly_grid(monthly_df_grouped)
+    tasks = [
+        (city, city_grid, years, directory / f"{str(city).replace(os.sep, '_')}.{format}")
+        for city, city_grid in zip(cities, grid)
+    ]
+
+    if max_workers == 1:
+        template = _heatmap_template(figsize)
+        paths = [_render_heatmap(task, template) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_heatmap_worker,
+                                 initargs=(figsize,)) as executor:
+            workers = max_workers or os.cpu_count() or 1
+            chunksize = max(1, len(tasks) // (4 * workers))  # mniej komunikacji między procesami
+            paths = list(executor.map(_render_heatmap, tasks, chunksize=chunksize))
+    return dict(zip(cities, paths))
+
+
 
+def small_multiples(monthly_df_grouped, cities=None, cols=10, panel_size=1.5, show=True, path=None):
+    """
+        Funkcja rysująca siatkę małych heatmap (rok x miesiąc) dla wielu miast ze wspólną skalą kolorów
+        i jednym paskiem kolorów - do przeglądu setek miast na jednym wykresie.
+
+    Panele rysowane są bezpośrednio z widoków tablicy `monthly_grid` (`imshow`), bez ramek pośrednich.
 
+    Args:
+        monthly_df_grouped (pd.DataFrame): Ramka średnich miesięcznych zgrupowana po miastach.
+        cities (list[str], optional): Miasta do narysowania. Domyślnie wszystkie.
+        cols (int, optional): Liczba paneli w wierszu. Domyślnie 10.
+        panel_size (float, optional): Rozmiar panelu w calach. Domyślnie 1.5.
+        show (bool, optional): Czy wyświetlić wykres (`plt.show`). Domyślnie True.
+        path (str | Path, optional): Plik, do którego zapisać wykres (.png, .svg). Domyślnie None.
 
-def bar_plots(norms_df, year):
+    Returns:
+        Figure: Wykres.
+    """
+    import matplotlib.pyplot as plt
+
+    grid, cities, years = monthly_grid(monthly_df_grouped, cities)
+    n = len(cities)
+    cols = min(cols, n)
+    rows = int(np.ceil(n / cols))
+
+    fig, axes = plt.subplots(rows, cols, figsize=(panel_size * cols, panel_size * rows),
+                             sharex=True, sharey=True, squeeze=False)
+    axes = axes.flatten()
+    vmin, vmax = np.nanmin(grid), np.nanmax(grid)
+
+    for ax, city, city_grid in zip(axes, cities, grid):
+        image = ax.imshow(city_grid, cmap='YlOrRd', vmin=vmin, vmax=vmax, aspect='auto',
+                          extent=(0.5, 12.5, years[-1] + 0.5, years[0] - 0.5))
+        ax.set_title(str(city), fontsize='small')
+
+    for ax in axes[n:]:
+        ax.axis("off")
+
+    fig.colorbar(image, ax=axes.tolist(), label='PM2.5')
+    fig.supxlabel('Miesiąc')
+    fig.supylabel('Rok')
+    return _finish(fig, show, path)
+
+
+def bar_plots(norms_df, year, show=True, path=None):
     """
         Funkcja przygotowująca wykres słupkowy grupowany ze wszytkich analizowanych lat dla 3 stacji z najmniejszą i 3 z największą liczbą dni przekroczenia normy w wybranym roku, gdzie oś X – stacje,
         a oś Y – liczba dni z przekroczeniem normy
@@ -97,10 +269,15 @@ def bar_plots(norms_df, year):
         norms_df (pd.DataFrame): Dataframe z z MultiIndexem (['Miejscowość', 'Kod stacji']. 
             Kolumny to lata, wartości to liczba dni powyżej normy.
         year (int): Rok referencyjny dla wyboru stacji ekstremalnych. 
+        show (bool, optional): Czy wyświetlić wykres (`plt.show`). Domyślnie True.
+        path (str | Path, optional): Plik, do którego zapisać wykres (.png, .svg). Domyślnie None.
     
     Returns:
-        None
+        Figure: Wykres.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     min_stations = norms_df[year].nsmallest(3).index.get_level_values(1).tolist()
     max_stations = norms_df[year].nlargest(3).index.get_level_values(1).tolist()
     stations = min_stations + max_stations
@@ -115,31 +292,129 @@ def bar_plots(norms_df, year):
     plot_df['miasto_stacja'] = plot_df['Miejscowość'] + '\n' + plot_df['Kod stacji']
 
     # wykres
-    plt.figure(figsize=(10, 6))
-    sns.barplot(data=plot_df, x='miasto_stacja', y='liczba_dni', hue='rok', palette='Pastel2')
-    plt.xticks(rotation=45)
-    plt.ylabel('Liczba dni z przekroczeniem normy')
-    plt.title('Dni z przekroczeniem normy PM2.5 dla wybranych stacji')
-    plt.legend(title='Rok')
-    plt.tight_layout()
-    plt.show()
-    return 
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(data=plot_df, x='miasto_stacja', y='liczba_dni', hue='rok', palette='Pastel2', ax=ax)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_ylabel('Liczba dni z przekroczeniem normy')
+    ax.set_title('Dni z przekroczeniem normy PM2.5 dla wybranych stacji')
+    ax.legend(title='Rok')
+    fig.tight_layout()
+    return _finish(fig, show, path)
+
+
+TIMESERIES_LEVELS = {"hourly": 31, "daily": 2 * 366}  # maksymalny zakres (w dniach) dla poziomu agregacji
+
+
+def decimate_minmax(x, y, n_bins):
+    """
+    Funkcja zmniejsza liczbę punktów serii do co najwyżej 2 * `n_bins`, zachowując w każdym
+    przedziale punkt minimalny i maksymalny (kolejność czasowa bez zmian), więc wykres zachowuje
+    wszystkie skoki wartości widoczne przy danej szerokości w pikselach. Braki danych (NaN) są pomijane.
+
+    Args:
+        x (np.ndarray): Wartości osi X (np. czas), posortowane.
+        y (np.ndarray): Wartości serii.
+        n_bins (int): Liczba przedziałów (np. szerokość wykresu w pikselach).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Zdecymowane wartości x i y.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype="float64")
+    if len(y) <= 2 * n_bins:
+        keep = ~np.isnan(y)
+        return x[keep], y[keep]
+
+    size = int(np.ceil(len(y) / n_bins))
+    padded = np.full(n_bins * size, np.nan)
+    padded[:len(y)] = y
+    buckets = padded.reshape(n_bins, size)
+    valid = ~np.isnan(buckets).all(axis=1)
+    starts = np.arange(n_bins) * size
+    low = starts + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    high = starts + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    indices = np.unique(np.concatenate([low[valid], high[valid]]))
+    return x[indices], y[indices]
+
+
+def _select_columns(df, stations):
+    # kolumny według etykiet lub (dla MultiIndexu) według kodów stacji
+    if isinstance(df.columns, pd.MultiIndex):
+        codes = df.columns.get_level_values('Kod stacji')
+        return df.loc[:, codes.isin(stations) | df.columns.isin(stations)]
+    return df[stations]
+
+
+def plot_timeseries(df_all, stations, start=None, end=None, level="auto", ax=None, show=True, path=None):
+    """
+        Funkcja rysująca przebieg czasowy PM2.5 dla wybranych stacji z danych godzinowych (np. wielu lat).
+
+    Liczba rysowanych punktów ograniczona jest do szerokości osi w pikselach (`decimate_minmax` -
+    minimum i maksimum w każdym przedziale), dzięki czemu dziesiątki tysięcy pomiarów rysowane są szybko,
+    bez utraty widocznych skoków wartości. Dla `level="auto"` poziom agregacji wybierany jest według
+    zakresu czasu: godzinowy do 31 dni, dobowy do 2 lat, powyżej - miesięczny.
+
+    Args:
+        df_all (pd.DataFrame): Scalona ramka danych godzinowych (DatetimeIndex, stacje w kolumnach).
+        stations (list): Kody stacji lub etykiety kolumn do narysowania.
+        start, end (str | pd.Timestamp, optional): Zakres czasu. Domyślnie całe dane.
+        level (str, optional): "auto", "hourly", "daily" lub "monthly". Domyślnie "auto".
+        ax (Axes, optional): Osie do rysowania. Domyślnie nowy wykres.
+        show (bool, optional): Czy wyświetlić wykres (`plt.show`). Domyślnie True.
+        path (str | Path, optional): Plik, do którego zapisać wykres (.png, .svg). Domyślnie None.
+
+    Returns:
+        Figure: Wykres.
+    """
+    import matplotlib.pyplot as plt
+
+    df = _select_columns(df_all, stations).loc[start:end]
+    if level == "auto":
+        span = (df.index[-1] - df.index[0]) / pd.Timedelta(days=1) if len(df) else 0
+        level = next((name for name, days in TIMESERIES_LEVELS.items() if span <= days), "monthly")
+    if level == "daily":
+        df = daily_mean(df)
+    elif level == "monthly":
+        df = df.groupby(df.index.values.astype("datetime64[M]")).mean()
+    elif level != "hourly":
+        raise ValueError(f"Nieznany poziom agregacji: {level}. Dostępne: auto, hourly, daily, monthly")
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(12, 4))
+    fig = ax.figure
+    n_bins = max(1, int(ax.get_window_extent().width))  # szerokość osi w pikselach
+
+    x = df.index.to_numpy()
+    for column in df.columns:
+        x_dec, y_dec = decimate_minmax(x, df[column].to_numpy(), n_bins)
+        label = column[-1] if isinstance(column, tuple) else column
+        ax.plot(x_dec, y_dec, label=label, linewidth=0.8)
+
+    ax.set_xlabel('Czas')
+    ax.set_ylabel('PM2.5')
+    ax.set_title(f'PM2.5 - dane {dict(hourly="godzinowe", daily="dobowe", monthly="miesięczne")[level]}')
+    ax.legend()
+    return _finish(fig, show, path)
 
 
 #wizualizacja do zad. 5 z województwami:
-def plot_voivodeship_exceedances(voiv_df, years=(2015, 2018, 2021, 2024), figsize=(12, 6)):
+def plot_voivodeship_exceedances(voiv_df, years=(2015, 2018, 2021, 2024), figsize=(12, 6), show=True, path=None):
     """
     Wykres słupkowy: liczba dni, w których średnia dobowa PM2.5 w województwie (średnia po stacjach) przekroczyła normę.
+    Zwraca obiekt `Figure`; `show` i `path` jak w pozostałych funkcjach modułu.
     """
+    import matplotlib.pyplot as plt
+
     years = [y for y in years if y in voiv_df.columns]
     df = voiv_df[years]
-    ax = df.plot(kind="bar", figsize=figsize)
+    fig, ax = plt.subplots(figsize=figsize)
+    df.plot(kind="bar", ax=ax)
     ax.set_title("Liczba dni z przekroczeniem normy PM2.5 dla średniej dobowej województwa")
     ax.set_xlabel("Województwo")
     ax.set_ylabel("Liczba dni z przekroczeniem")
     ax.legend(title="Rok", loc="center left", bbox_to_anchor=(1.02, 0.5))
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    return _finish(fig, show, path)
     
 if __name__ == "__main__":
     pass
\ No newline at end of file